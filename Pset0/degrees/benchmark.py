@@ -0,0 +1,148 @@
+"""
+Micro-benchmarks for the degrees search code.
+
+Usage: python benchmark.py frontier [--sizes N ...]
+       python benchmark.py landmarks [directory] [--count K] [--queries Q]
+"""
+
+import argparse
+import math
+import random
+import time
+
+import snapshot
+from landmarks import LandmarkIndex
+from util import Node, QueueFrontier, bidirectional_search
+
+
+class ListQueueFrontier():
+    """
+    The original list-backed queue, kept here only as a baseline:
+    remove slices the list and contains_state scans it, both O(n).
+    """
+
+    def __init__(self):
+        self.frontier = []
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_state(self, state):
+        return any(node.state == state for node in self.frontier)
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        node = self.frontier[0]
+        self.frontier = self.frontier[1:]
+        return node
+
+
+def binary_tree_bfs(frontier, size):
+    """
+    Runs the CS50 style BFS loop over an implicit binary tree of size
+    nodes, where node i has children 2i + 1 and 2i + 2.
+    Returns the number of nodes explored.
+    """
+    frontier.add(Node(state=0, parent=None, action=None))
+    explored = set()
+    while not frontier.empty():
+        node = frontier.remove()
+        explored.add(node.state)
+        for child in (2 * node.state + 1, 2 * node.state + 2):
+            if (child < size and child not in explored
+                    and not frontier.contains_state(child)):
+                frontier.add(Node(state=child, parent=node, action=None))
+    return len(explored)
+
+
+def bench_frontier(sizes, baseline_limit):
+    """
+    Times BFS at each size and prints the cost per node, which stays
+    flat for linear-time frontiers and grows with size otherwise.
+    """
+    print(f"{'nodes':>10} {'frontier':>18} {'seconds':>10} {'us/node':>10}")
+    for size in sizes:
+        frontiers = [("QueueFrontier", QueueFrontier)]
+        if size <= baseline_limit:
+            frontiers.append(("ListQueueFrontier", ListQueueFrontier))
+        for label, frontier_class in frontiers:
+            start = time.perf_counter()
+            explored = binary_tree_bfs(frontier_class(), size)
+            elapsed = time.perf_counter() - start
+            assert explored == size
+            print(f"{size:>10} {label:>18} {elapsed:>10.3f} "
+                  f"{elapsed / size * 1e6:>10.2f}")
+
+
+def bench_landmarks(directory, count, queries):
+    """
+    Reports landmark index build time and size, then compares query
+    latency with and without the index on random pairs of people.
+    """
+    graph = snapshot.load_graph(directory)
+    start = time.perf_counter()
+    index = LandmarkIndex.build(graph, count)
+    build = time.perf_counter() - start
+    size = len(index.distances) + len(index.landmarks) * 4
+    print(f"built {len(index.landmarks)} landmarks over "
+          f"{len(graph.person_ids)} people in {build:.2f} s, "
+          f"{size / 1e6:.1f} MB")
+
+    rng = random.Random(0)
+    people = len(graph.person_ids)
+    pairs = [(rng.randrange(people), rng.randrange(people))
+             for _ in range(queries)]
+
+    def timed(query):
+        start = time.perf_counter()
+        results = [query(source, target) for source, target in pairs]
+        return results, (time.perf_counter() - start) / len(pairs)
+
+    bounds, bounds_time = timed(index.bounds)
+    exact = sum(1 for lower, upper in bounds
+                if lower == upper or lower == math.inf)
+    _, distance_time = timed(index.distance)
+    _, indexed_time = timed(index.shortest_path)
+    _, plain_time = timed(
+        lambda source, target: bidirectional_search(source, target,
+                                                    graph.neighbors)
+    )
+    print(f"bounds:            {bounds_time * 1e6:10.1f} us/query, "
+          f"exact for {exact}/{len(pairs)}")
+    print(f"distance:          {distance_time * 1e6:10.1f} us/query")
+    print(f"path with index:   {indexed_time * 1e6:10.1f} us/query")
+    print(f"path without:      {plain_time * 1e6:10.1f} us/query")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    frontier = commands.add_parser("frontier", help="BFS frontier scaling")
+    frontier.add_argument("--sizes", type=int, nargs="+",
+                          default=[10_000, 100_000, 1_000_000])
+    frontier.add_argument(
+        "--baseline-limit", type=int, default=20_000,
+        help="largest size to run the list-backed baseline on"
+    )
+
+    landmarks = commands.add_parser("landmarks", help="landmark index")
+    landmarks.add_argument("directory", nargs="?", default="large")
+    landmarks.add_argument("--count", type=int, default=16)
+    landmarks.add_argument("--queries", type=int, default=1000)
+
+    args = parser.parse_args()
+    if args.command == "frontier":
+        bench_frontier(args.sizes, args.baseline_limit)
+    elif args.command == "landmarks":
+        bench_landmarks(args.directory, args.count, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Degree-of-separation distributions from hub people to everyone else.
+
+Each hub needs one full breadth-first search. The searches run in a
+process pool whose workers each map the same graph snapshot read-only,
+so the operating system shares its pages instead of every worker
+unpickling its own copy of the data.
+
+Usage: python bulk.py [directory] [--hub NAME ...] [--top N] [--processes P]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+
+import snapshot
+from graph import UNREACHABLE
+
+# Graph mapped by each worker process
+graph = None
+
+
+def open_worker(path):
+    """Pool initializer: maps the snapshot at path into this worker."""
+    global graph
+    _, graph = snapshot.load(path)
+
+
+def histogram(distances):
+    """
+    Returns how many people lie at each distance, from 0 up to the
+    farthest reached, and how many were never reached.
+    """
+    counts = []
+    reached = len(distances) - distances.count(UNREACHABLE)
+    while reached:
+        count = distances.count(len(counts))
+        counts.append(count)
+        reached -= count
+    return counts, len(distances) - sum(counts)
+
+
+def hub_histogram(hub):
+    """Worker task: runs one BFS from hub and summarises it."""
+    counts, unreachable = histogram(graph.distances_from(hub))
+    return hub, counts, unreachable
+
+
+def distance_histograms(directory, hubs, processes=None):
+    """
+    Yields (person_id, counts, unreachable) for each hub person id as its
+    search finishes, where counts[d] is how many people are d degrees
+    away. The snapshot is built first if it is missing or stale.
+    """
+    parent = snapshot.load_graph(directory)
+    indices = [parent.person_index(person_id) for person_id in hubs]
+    path = os.path.join(directory, snapshot.FILENAME)
+    if not os.path.exists(path):
+        raise snapshot.SnapshotError(f"could not write {path}")
+
+    with multiprocessing.Pool(processes, open_worker, (path,)) as pool:
+        for hub, counts, unreachable in pool.imap_unordered(hub_histogram,
+                                                            indices):
+            yield parent.person_ids[hub], counts, unreachable
+
+
+def top_hubs(graph, count):
+    """Returns the ids of the count people with the most movies."""
+    people = sorted(range(len(graph.person_ids)),
+                    key=lambda person: len(graph.movies_of(person)),
+                    reverse=True)
+    return [graph.person_ids[person] for person in people[:count]]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Distance histograms from hub people to everyone else."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--hub", action="append", default=[],
+                        help="name of a hub person, may be repeated")
+    parser.add_argument("--top", type=int, default=0,
+                        help="also use the N people with the most movies")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    graph = snapshot.load_graph(args.directory)
+    hubs = []
+    for name in args.hub:
+        people = graph.people_named(name.lower())
+        if len(people) != 1:
+            parser.error(f"{name!r} matches {len(people)} people")
+        hubs.append(graph.person_ids[people[0]])
+    hubs.extend(top_hubs(graph, args.top))
+    # A --hub who is also among the --top people is searched only once
+    hubs = list(dict.fromkeys(hubs))
+    if not hubs:
+        parser.error("give at least one --hub or --top")
+
+    for person_id, counts, unreachable in distance_histograms(
+            args.directory, hubs, args.processes):
+        print(json.dumps({
+            "id": person_id,
+            "name": graph.people[person_id]["name"],
+            "distances": counts,
+            "unreachable": unreachable,
+        }))
+
+
+if __name__ == "__main__":
+    main()
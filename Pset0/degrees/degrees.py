@@ -1,7 +1,9 @@
 import csv
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+import snapshot
+from util import (Node, StackFrontier, QueueFrontier, all_shortest_paths,
+                  bidirectional_search)
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,11 +14,27 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact integer-indexed copy of the data, set by load_data(compact=True)
+graph = None
 
-def load_data(directory):
+
+def load_data(directory, compact=True):
     """
     Load data from CSV files into memory.
+
+    By default the data is held in a StarGraph opened from a binary
+    snapshot next to the CSV files, which is rebuilt whenever one of them
+    changes, and names, people and movies become read-only views over it.
+    With compact=False the CSV files are parsed into plain dicts instead.
     """
+    global graph, names, people, movies
+    if compact:
+        graph = snapshot.load_graph(directory)
+        names, people, movies = graph.names, graph.people, graph.movies
+        return
+    graph = None
+    names, people, movies = {}, {}, {}
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -91,9 +109,68 @@ def shortest_path(source, target):
 
     If no possible path, returns None.
     """
+    if graph is not None:
+        path = bidirectional_search(graph.person_index(source),
+                                    graph.person_index(target),
+                                    graph.neighbors)
+        if path is None:
+            return None
+        return [(graph.movie_ids[movie], graph.person_ids[person])
+                for movie, person in path]
+    return bidirectional_search(source, target, neighbors_for_person)
+
+
+def shortest_paths(source, target, min_year=None, max_year=None):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs that
+    connect the source to the target, one at a time.
+
+    Only movies released between min_year and max_year, inclusive, are
+    used when either is given. Paths are produced lazily, so
+    itertools.islice(shortest_paths(source, target), k) finds k of them
+    without enumerating the rest.
+    """
+    if graph is not None:
+        neighbors = graph.neighbors
+        year = graph.movie_years.__getitem__
+        source = graph.person_index(source)
+        target = graph.person_index(target)
+    else:
+        neighbors = neighbors_for_person
+        year = lambda movie_id: movies[movie_id]["year"]
+
+    if min_year is not None or max_year is not None:
+        neighbors = released_between(neighbors, year, min_year, max_year)
+
+    for path in all_shortest_paths(source, target, neighbors):
+        if graph is not None:
+            path = [(graph.movie_ids[movie], graph.person_ids[person])
+                    for movie, person in path]
+        yield path
+
+
+def released_between(neighbors, year, min_year, max_year):
+    """
+    Wraps a neighbors function to skip movies released outside
+    min_year and max_year, or with no known year.
+    """
+    allowed = {}
+
+    def check(movie):
+        if movie not in allowed:
+            try:
+                released = int(year(movie))
+            except ValueError:
+                allowed[movie] = False
+            else:
+                allowed[movie] = (
+                    (min_year is None or released >= min_year)
+                    and (max_year is None or released <= max_year)
+                )
+        return allowed[movie]
 
-    # TODO
-    raise NotImplementedError
+    return lambda person: [(movie, other) for movie, other in neighbors(person)
+                           if check(movie)]
 
 
 def person_id_for_name(name):
@@ -127,6 +204,8 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return graph.neighbors_for_id(person_id)
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
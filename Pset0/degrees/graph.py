@@ -0,0 +1,372 @@
+"""
+Compact integer-indexed representation of the degrees star dataset.
+
+People and movies are interned to dense ints, the person-movie bipartite
+graph is stored as two CSR adjacency arrays, and every text column is a
+packed UTF-8 string table. Nothing is stored per row as a Python object.
+"""
+
+import bisect
+import csv
+from array import array
+from collections.abc import Mapping
+
+# Typecodes for CSR offsets/indices and for string table offsets
+INDEX = "i"
+OFFSET = "q"
+
+# Distance recorded for people a search never reaches
+UNREACHABLE = 255
+
+
+class StringTable():
+    """
+    Sequence of strings packed into one UTF-8 buffer plus an offset array.
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return str(self.data[self.offsets[index]:self.offsets[index + 1]],
+                   "utf-8")
+
+
+class StringTableBuilder():
+    """
+    Accumulates strings for a StringTable one at a time.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array(OFFSET, [0])
+
+    def append(self, string):
+        self.data += string.encode("utf-8")
+        self.offsets.append(len(self.data))
+
+    def build(self):
+        return StringTable(bytes(self.data), memoryview(self.offsets))
+
+
+# Every column a StarGraph is made of, in the order they are stored
+COLUMNS = (
+    "person_ids", "person_names", "person_births",
+    "movie_ids", "movie_titles", "movie_years",
+    "person_offsets", "person_movies",
+    "movie_offsets", "movie_people",
+    "person_order", "movie_order", "name_order",
+)
+
+
+class StarGraph():
+    """
+    People, movies and who starred in what, indexed by dense ints.
+
+    person_movies[person_offsets[p]:person_offsets[p + 1]] are the movies
+    person p starred in, and movie_people is laid out the same way.
+    person_order, movie_order and name_order list indices sorted by id,
+    id and lowercase name, so lookups are a binary search.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        for name in COLUMNS:
+            setattr(self, name, columns[name])
+        self.people = PeopleView(self)
+        self.movies = MoviesView(self)
+        self.names = NamesView(self)
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Builds a graph from the people, movies and stars CSV files. Every
+        row gets its own index, and when an id is repeated its last row
+        is the one credits attach to, as in ingest.ingest.
+        """
+        person_index = {}
+        person_ids = StringTableBuilder()
+        person_names = StringTableBuilder()
+        person_births = StringTableBuilder()
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            for index, row in enumerate(csv.DictReader(f)):
+                person_index[row["id"]] = index
+                person_ids.append(row["id"])
+                person_names.append(row["name"])
+                person_births.append(row["birth"])
+
+        movie_index = {}
+        movie_ids = StringTableBuilder()
+        movie_titles = StringTableBuilder()
+        movie_years = StringTableBuilder()
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            for index, row in enumerate(csv.DictReader(f)):
+                movie_index[row["id"]] = index
+                movie_ids.append(row["id"])
+                movie_titles.append(row["title"])
+                movie_years.append(row["year"])
+
+        # Encode each credit as one int so duplicates collapse and sorting
+        # groups credits by person
+        credits = set()
+        person_count = len(person_ids.offsets) - 1
+        movie_count = len(movie_ids.offsets) - 1
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    person = person_index[row["person_id"]]
+                    movie = movie_index[row["movie_id"]]
+                except KeyError:
+                    continue
+                credits.add(person * movie_count + movie)
+        credits = sorted(credits)
+
+        columns = {
+            "person_ids": person_ids.build(),
+            "person_names": person_names.build(),
+            "person_births": person_births.build(),
+            "movie_ids": movie_ids.build(),
+            "movie_titles": movie_titles.build(),
+            "movie_years": movie_years.build(),
+        }
+        columns.update(build_csr(credits, person_count, movie_count))
+        columns.update(build_orders(columns))
+        return cls(columns)
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people who starred with
+        a given person, including the person themselves.
+        """
+        person_offsets, person_movies = self.person_offsets, self.person_movies
+        movie_offsets, movie_people = self.movie_offsets, self.movie_people
+        for movie in person_movies[person_offsets[person]:
+                                   person_offsets[person + 1]]:
+            for other in movie_people[movie_offsets[movie]:
+                                      movie_offsets[movie + 1]]:
+                yield movie, other
+
+    def neighbors_for_id(self, person_id):
+        """
+        Same as neighbors, but takes and yields string ids.
+        """
+        movie_ids, person_ids = self.movie_ids, self.person_ids
+        for movie, other in self.neighbors(self.person_index(person_id)):
+            yield movie_ids[movie], person_ids[other]
+
+    def distances_from(self, person):
+        """
+        Runs a breadth-first search from person over the co-star graph.
+
+        Returns a bytearray of hop counts indexed by person, with
+        UNREACHABLE for people in other components. Each movie is expanded
+        at most once, so the search is linear in the size of the graph.
+        """
+        distances = bytearray([UNREACHABLE]) * len(self.person_ids)
+        expanded = bytearray(len(self.movie_ids))
+        distances[person] = 0
+        layer = [person]
+        depth = 0
+        while layer and depth < UNREACHABLE - 1:
+            depth += 1
+            next_layer = []
+            for current in layer:
+                for movie in self.movies_of(current):
+                    if expanded[movie]:
+                        continue
+                    expanded[movie] = 1
+                    for other in self.stars_of(movie):
+                        if distances[other] == UNREACHABLE:
+                            distances[other] = depth
+                            next_layer.append(other)
+            layer = next_layer
+        return distances
+
+    def movies_of(self, person):
+        return self.person_movies[self.person_offsets[person]:
+                                  self.person_offsets[person + 1]]
+
+    def stars_of(self, movie):
+        return self.movie_people[self.movie_offsets[movie]:
+                                 self.movie_offsets[movie + 1]]
+
+    def person_index(self, person_id):
+        """
+        Returns the index of a person id, raising KeyError if unknown.
+        """
+        return find(self.person_order, self.person_ids.__getitem__,
+                    person_id)
+
+    def movie_index(self, movie_id):
+        """
+        Returns the index of a movie id, raising KeyError if unknown.
+        """
+        return find(self.movie_order, self.movie_ids.__getitem__, movie_id)
+
+    def people_named(self, name):
+        """
+        Returns the indices of everyone whose lowercase name is name.
+        """
+        order = self.name_order
+        key = self.lower_name
+        start = bisect.bisect_left(order, name, key=key)
+        end = bisect.bisect_right(order, name, lo=start, key=key)
+        return list(order[start:end])
+
+    def lower_name(self, person):
+        return self.person_names[person].lower()
+
+
+def find(order, key, value):
+    """
+    Binary searches order, a list of indices sorted by key, for value.
+    Ties are in index order, so a repeated id finds its last row.
+    """
+    position = bisect.bisect_right(order, value, key=key)
+    if position == 0 or key(order[position - 1]) != value:
+        raise KeyError(value)
+    return order[position - 1]
+
+
+def build_csr(credits, person_count, movie_count):
+    """
+    Builds both CSR adjacency arrays from credits sorted by person,
+    each encoded as person * movie_count + movie.
+    """
+    person_offsets = zeros(person_count + 1)
+    person_movies = array(INDEX)
+    movie_degrees = zeros(movie_count)
+    for credit in credits:
+        person, movie = divmod(credit, movie_count)
+        person_offsets[person + 1] += 1
+        person_movies.append(movie)
+        movie_degrees[movie] += 1
+    for person in range(person_count):
+        person_offsets[person + 1] += person_offsets[person]
+
+    # Counting sort the same credits by movie
+    movie_offsets = array(INDEX, [0])
+    for degree in movie_degrees:
+        movie_offsets.append(movie_offsets[-1] + degree)
+    movie_people = zeros(len(credits))
+    cursor = movie_offsets[:-1]
+    for person in range(person_count):
+        for movie in person_movies[person_offsets[person]:
+                                   person_offsets[person + 1]]:
+            movie_people[cursor[movie]] = person
+            cursor[movie] += 1
+
+    return {
+        "person_offsets": memoryview(person_offsets),
+        "person_movies": memoryview(person_movies),
+        "movie_offsets": memoryview(movie_offsets),
+        "movie_people": memoryview(movie_people),
+    }
+
+
+def zeros(count):
+    return array(INDEX, bytes(array(INDEX).itemsize * count))
+
+
+def build_orders(columns):
+    """
+    Builds the sorted index permutations used for id and name lookups.
+    """
+    person_ids = columns["person_ids"]
+    movie_ids = columns["movie_ids"]
+    person_names = columns["person_names"]
+    return {
+        "person_order": memoryview(array(INDEX, sorted(
+            range(len(person_ids)), key=person_ids.__getitem__))),
+        "movie_order": memoryview(array(INDEX, sorted(
+            range(len(movie_ids)), key=movie_ids.__getitem__))),
+        "name_order": memoryview(array(INDEX, sorted(
+            range(len(person_names)),
+            key=lambda person: person_names[person].lower()))),
+    }
+
+
+class PeopleView(Mapping):
+    """
+    Read-only stand-in for degrees.people backed by a StarGraph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        person = graph.person_index(person_id)
+        return {
+            "name": graph.person_names[person],
+            "birth": graph.person_births[person],
+            "movies": {graph.movie_ids[movie]
+                       for movie in graph.movies_of(person)},
+        }
+
+    def __iter__(self):
+        person_ids = self.graph.person_ids
+        return (person_ids[person] for person in range(len(person_ids)))
+
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+
+class MoviesView(Mapping):
+    """
+    Read-only stand-in for degrees.movies backed by a StarGraph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        movie = graph.movie_index(movie_id)
+        return {
+            "title": graph.movie_titles[movie],
+            "year": graph.movie_years[movie],
+            "stars": {graph.person_ids[person]
+                      for person in graph.stars_of(movie)},
+        }
+
+    def __iter__(self):
+        movie_ids = self.graph.movie_ids
+        return (movie_ids[movie] for movie in range(len(movie_ids)))
+
+    def __len__(self):
+        return len(self.graph.movie_ids)
+
+
+class NamesView(Mapping):
+    """
+    Read-only stand-in for degrees.names backed by a StarGraph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.count = None
+
+    def __getitem__(self, name):
+        graph = self.graph
+        people = graph.people_named(name)
+        if not people:
+            raise KeyError(name)
+        return {graph.person_ids[person] for person in people}
+
+    def __iter__(self):
+        previous = None
+        for person in self.graph.name_order:
+            name = self.graph.lower_name(person)
+            if name != previous:
+                yield name
+                previous = name
+
+    def __len__(self):
+        if self.count is None:
+            self.count = sum(1 for _ in self)
+        return self.count
@@ -0,0 +1,352 @@
+"""
+Streaming ingest of the degrees CSV files into a graph snapshot.
+
+StarGraph.from_csv holds every credit in memory while it builds the
+graph. This module instead writes the same snapshot in bounded memory,
+so full IMDb dumps with tens of millions of credits load on a modest box:
+rows are buffered at most chunk_size at a time, sorted and spilled to
+temporary run files, and every join and adjacency list is built by
+merging sorted runs. Credits naming an unknown person or movie are
+counted instead of silently dropped.
+
+The snapshot records the same source fingerprints as snapshot.load_graph,
+which opens it as up to date afterwards.
+
+Usage: python ingest.py [directory] [--chunk-size N]
+"""
+
+import argparse
+import csv
+import heapq
+import json
+import os
+import pickle
+import tempfile
+from array import array
+
+import snapshot
+from graph import INDEX, OFFSET
+
+CHUNK_SIZE = 500_000
+
+# Records per pickled batch in run files, and ints per spilled block
+BATCH = 8192
+
+
+class ExternalSorter():
+    """
+    Sorts more records than fit in memory.
+
+    add() buffers records and spills every chunk_size of them to a sorted
+    run file in scratch. sorted() merges the runs back in order.
+    """
+
+    def __init__(self, scratch, chunk_size, key=None):
+        self.scratch = scratch
+        self.chunk_size = chunk_size
+        self.key = key
+        self.buffer = []
+        self.runs = []
+
+    def add(self, record):
+        self.buffer.append(record)
+        if len(self.buffer) >= self.chunk_size:
+            self.spill()
+
+    def spill(self):
+        self.buffer.sort(key=self.key)
+        self.runs.append(write_run(self.scratch, self.buffer))
+        self.buffer = []
+
+    def sorted(self):
+        """Yields every record added so far in sorted order."""
+        if not self.runs:
+            self.buffer.sort(key=self.key)
+            yield from self.buffer
+            self.buffer = []
+            return
+        if self.buffer:
+            self.spill()
+        runs, self.runs = self.runs, []
+        try:
+            yield from heapq.merge(*(read_run(run) for run in runs),
+                                   key=self.key)
+        finally:
+            for run in runs:
+                os.remove(run)
+
+
+def write_run(scratch, records):
+    """Writes records to a new run file in scratch and returns its path."""
+    descriptor, path = tempfile.mkstemp(dir=scratch, suffix=".run")
+    with os.fdopen(descriptor, "wb") as f:
+        for start in range(0, len(records), BATCH):
+            pickle.dump(records[start:start + BATCH], f,
+                        pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def read_run(path):
+    """Yields the records of a run file."""
+    with open(path, "rb") as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            yield from batch
+
+
+class SpillArray():
+    """
+    Append-only array of ints kept in a temporary file.
+    """
+
+    def __init__(self, scratch, typecode):
+        self.typecode = typecode
+        self.buffer = array(typecode)
+        self.file = tempfile.TemporaryFile(dir=scratch)
+        self.length = 0
+
+    def append(self, value):
+        self.buffer.append(value)
+        self.length += 1
+        if len(self.buffer) >= BATCH:
+            self.flush()
+
+    def flush(self):
+        self.buffer.tofile(self.file)
+        self.buffer = array(self.typecode)
+
+    def copy_to(self, writer, name):
+        """Writes the array as section name, then discards it."""
+        self.flush()
+        self.file.seek(0)
+        writer.begin(name, self.typecode)
+        for block in iter(lambda: self.file.read(1 << 20), b""):
+            writer.extend(block)
+        writer.end()
+        self.file.close()
+
+
+class SpillStrings():
+    """
+    String column kept in temporary files, laid out like a StringTable.
+    """
+
+    def __init__(self, scratch):
+        self.data = tempfile.TemporaryFile(dir=scratch)
+        self.size = 0
+        self.offsets = SpillArray(scratch, OFFSET)
+        self.offsets.append(0)
+
+    def append(self, string):
+        encoded = string.encode("utf-8")
+        self.data.write(encoded)
+        self.size += len(encoded)
+        self.offsets.append(self.size)
+
+    def copy_to(self, writer, name):
+        self.data.seek(0)
+        writer.begin(f"{name}.data", "B")
+        for block in iter(lambda: self.data.read(1 << 20), b""):
+            writer.extend(block)
+        writer.end()
+        self.data.close()
+        self.offsets.copy_to(writer, f"{name}.offsets")
+
+
+def ingest_table(path, fields, columns, scratch, chunk_size, writer,
+                 order, name_order=None):
+    """
+    Streams one CSV table into string columns of the snapshot.
+
+    Writes the index permutation sorted by id as section order, and, if
+    name_order is given, the one sorted by lowercase name. Returns the row
+    count and a run file of (id, index) pairs sorted by id for joining.
+    """
+    strings = [SpillStrings(scratch) for _ in columns]
+    by_id = ExternalSorter(scratch, chunk_size)
+    by_name = ExternalSorter(scratch, chunk_size)
+    count = 0
+    with open(path, encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            for column, field in zip(strings, fields):
+                column.append(row[field])
+            by_id.add((row[fields[0]], count))
+            if name_order is not None:
+                by_name.add((row["name"].lower(), count))
+            count += 1
+
+    for column, name in zip(strings, columns):
+        column.copy_to(writer, name)
+
+    # Keep the sorted ids for joins while writing their order section
+    ids = SpillArray(scratch, INDEX)
+    sorted_ids = []
+    runs = []
+    for record in by_id.sorted():
+        ids.append(record[1])
+        sorted_ids.append(record)
+        if len(sorted_ids) >= chunk_size:
+            runs.append(write_run(scratch, sorted_ids))
+            sorted_ids = []
+    runs.append(write_run(scratch, sorted_ids))
+    ids.copy_to(writer, order)
+
+    if name_order is not None:
+        names = SpillArray(scratch, INDEX)
+        for _, index in by_name.sorted():
+            names.append(index)
+        names.copy_to(writer, name_order)
+
+    return count, runs
+
+
+def read_runs(runs):
+    """Yields the records of several run files one after another."""
+    for run in runs:
+        yield from read_run(run)
+
+
+def join(records, table, stats, label):
+    """
+    Merge-joins records, sorted by their first field, against (id, index)
+    pairs sorted by id. Yields (record, index) for every record whose id
+    is in the table, counting the others in stats[label]. When an id is
+    repeated in the table its last row wins.
+    """
+    table = iter(table)
+    current = (None, None)
+    pending = next(table, None)
+    for record in records:
+        key = record[0]
+        while pending is not None and pending[0] <= key:
+            current = pending
+            pending = next(table, None)
+        if current[0] == key:
+            yield record, current[1]
+        else:
+            stats[label] += 1
+
+
+def write_csr(pairs, rows, writer, name, offsets, stats=None, each=None):
+    """
+    Streams (row, column) pairs sorted by row into section name, filling
+    offsets with rows + 1 CSR offsets. Repeated pairs are written once and
+    counted in stats["duplicates"]; each(row, column) is called for every
+    pair kept.
+    """
+    writer.begin(name, INDEX)
+    buffer = array(INDEX)
+    current = 0
+    total = 0
+    previous = None
+    offsets.append(0)
+    for pair in pairs:
+        if pair == previous:
+            if stats is not None:
+                stats["duplicates"] += 1
+            continue
+        previous = pair
+        row, column = pair
+        while current < row:
+            offsets.append(total)
+            current += 1
+        buffer.append(column)
+        total += 1
+        if len(buffer) >= BATCH:
+            writer.extend(buffer)
+            buffer = array(INDEX)
+        if each is not None:
+            each(row, column)
+    while current < rows:
+        offsets.append(total)
+        current += 1
+    writer.extend(buffer)
+    writer.end()
+    return total
+
+
+def ingest(directory, chunk_size=CHUNK_SIZE, path=None):
+    """
+    Builds the snapshot for a directory of CSV files in bounded memory.
+    Returns counts of rows read, credits kept and credits skipped.
+    """
+    if path is None:
+        path = os.path.join(directory, snapshot.FILENAME)
+    header = snapshot.header_for(directory)
+    stats = {"people": 0, "movies": 0, "credits": 0, "duplicates": 0,
+             "unknown_person": 0, "unknown_movie": 0}
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with tempfile.TemporaryDirectory(dir=directory) as scratch:
+            writer = snapshot.SnapshotWriter(temporary)
+            stats["people"], people = ingest_table(
+                os.path.join(directory, "people.csv"),
+                ("id", "name", "birth"),
+                ("person_ids", "person_names", "person_births"),
+                scratch, chunk_size, writer, "person_order", "name_order"
+            )
+            stats["movies"], movies = ingest_table(
+                os.path.join(directory, "movies.csv"),
+                ("id", "title", "year"),
+                ("movie_ids", "movie_titles", "movie_years"),
+                scratch, chunk_size, writer, "movie_order"
+            )
+
+            # Replace person ids, then movie ids, by their indices
+            by_person = ExternalSorter(scratch, chunk_size)
+            with open(os.path.join(directory, "stars.csv"),
+                      encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    by_person.add((row["person_id"], row["movie_id"]))
+            by_movie = ExternalSorter(scratch, chunk_size)
+            for (_, movie_id), person in join(by_person.sorted(),
+                                              read_runs(people), stats,
+                                              "unknown_person"):
+                by_movie.add((movie_id, person))
+            credits = ExternalSorter(scratch, chunk_size)
+            for (_, person), movie in join(by_movie.sorted(),
+                                           read_runs(movies), stats,
+                                           "unknown_movie"):
+                credits.add((person, movie))
+
+            # Person-major adjacency first, feeding the movie-major sort
+            transposed = ExternalSorter(scratch, chunk_size)
+            person_offsets = SpillArray(scratch, INDEX)
+            stats["credits"] = write_csr(
+                credits.sorted(), stats["people"], writer, "person_movies",
+                person_offsets, stats,
+                lambda person, movie: transposed.add((movie, person))
+            )
+            person_offsets.copy_to(writer, "person_offsets")
+            movie_offsets = SpillArray(scratch, INDEX)
+            write_csr(transposed.sorted(), stats["movies"], writer,
+                      "movie_people", movie_offsets)
+            movie_offsets.copy_to(writer, "movie_offsets")
+
+            for run in people + movies:
+                os.remove(run)
+            writer.close(dict(header, ingest=stats))
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build a degrees snapshot in bounded memory."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help="rows held in memory per sorted run")
+    args = parser.parse_args()
+    print(json.dumps(ingest(args.directory, args.chunk_size)))
+
+
+if __name__ == "__main__":
+    main()
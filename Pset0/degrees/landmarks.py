@@ -0,0 +1,229 @@
+"""
+Landmark distance index over the degrees co-star graph.
+
+A few well connected people are chosen as landmarks and their distance to
+everyone else is stored. By the triangle inequality, for any landmark l
+
+    |d(l, s) - d(l, t)| <= d(s, t) <= d(l, s) + d(l, t)
+
+so distance queries are answered from the bounds alone whenever they meet,
+and full path searches stop before any layer that could not beat the
+path through the best landmark.
+
+Usage: python landmarks.py [directory] [--count K]
+"""
+
+import argparse
+import math
+import os
+from array import array
+
+import snapshot
+from graph import INDEX, UNREACHABLE
+from util import bidirectional_search
+
+FILENAME = "landmarks.snapshot"
+KIND = "landmarks"
+
+
+class LandmarkIndex():
+    """
+    Distances from each landmark to every person, one row per landmark.
+    All methods take and return person indices of the StarGraph.
+    """
+
+    def __init__(self, graph, landmarks, distances):
+        self.graph = graph
+        self.landmarks = landmarks
+        self.distances = distances
+        size = len(graph.person_ids)
+        self.rows = [distances[row * size:(row + 1) * size]
+                     for row in range(len(landmarks))]
+
+    @classmethod
+    def build(cls, graph, count=16):
+        """
+        Picks count landmarks and runs one BFS from each.
+        """
+        distances = bytearray()
+        landmarks = array(INDEX)
+        for landmark in choose_landmarks(graph, count):
+            landmarks.append(landmark)
+            distances += graph.distances_from(landmark)
+        return cls(graph, landmarks, memoryview(distances))
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the distance from source to target.
+        Both are math.inf if a landmark proves they are not connected.
+        """
+        if source == target:
+            return 0, 0
+        lower, upper = 0, math.inf
+        for row in self.rows:
+            to_source, to_target = row[source], row[target]
+            if to_source == UNREACHABLE and to_target == UNREACHABLE:
+                continue
+            if to_source == UNREACHABLE or to_target == UNREACHABLE:
+                return math.inf, math.inf
+            lower = max(lower, abs(to_source - to_target))
+            upper = min(upper, to_source + to_target)
+        return lower, upper
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie, person) pairs from source to
+        target, or None.
+
+        The path through the best landmark is read off its distances
+        directly, so the search is cut off before any layer that could
+        only find paths as long as that one.
+        """
+        if source == target:
+            return []
+        lower, upper = self.bounds(source, target)
+        if lower == math.inf:
+            return None
+        if upper == math.inf:
+            return bidirectional_search(source, target, self.graph.neighbors)
+
+        # Search only for paths shorter than the one through the best
+        # landmark, which is returned if there are none
+        best = min(self.rows, key=lambda row: reach(row, source, target))
+        if lower < upper:
+            path = bidirectional_search(source, target, self.graph.neighbors,
+                                        upper - 1)
+            if path is not None:
+                return path
+        return (self.descend(best, source)
+                + reverse_path(self.descend(best, target), target))
+
+    def descend(self, row, person):
+        """
+        Returns a shortest list of (movie, person) pairs leading from
+        person to the landmark row measures distances from.
+        """
+        path = []
+        distance = row[person]
+        while distance:
+            for movie, other in self.graph.neighbors(person):
+                if row[other] == distance - 1:
+                    path.append((movie, other))
+                    person = other
+                    distance -= 1
+                    break
+        return path
+
+    def distance(self, source, target):
+        """
+        Returns the distance from source to target, or None if they are
+        not connected. Only searches when the bounds do not meet.
+        """
+        lower, upper = self.bounds(source, target)
+        if lower == math.inf:
+            return None
+        if lower == upper:
+            return lower
+        path = self.shortest_path(source, target)
+        return None if path is None else len(path)
+
+    def save(self, path, header):
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            writer = snapshot.SnapshotWriter(temporary)
+            writer.add("landmarks", self.landmarks)
+            writer.add("distances", self.distances)
+            writer.close(dict(header, kind=KIND))
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    @classmethod
+    def load(cls, graph, path):
+        header, sections = snapshot.open_sections(path)
+        if header.get("kind") != KIND:
+            raise snapshot.SnapshotError(f"{path} is not a landmark index")
+        return header, cls(graph, sections["landmarks"],
+                           sections["distances"])
+
+
+def reach(row, source, target):
+    """Length of the path from source to target through row's landmark."""
+    if row[source] == UNREACHABLE:
+        return math.inf
+    return row[source] + row[target]
+
+
+def reverse_path(path, start):
+    """
+    Reverses a list of (movie, person) pairs that leads away from start.
+    """
+    people = [start] + [person for _, person in path]
+    return [(movie, people[step])
+            for step, (movie, _) in reversed(list(enumerate(path)))]
+
+
+def choose_landmarks(graph, count):
+    """
+    Picks up to count people with the most movies, skipping anyone who
+    shares a movie with a landmark already chosen, so landmarks spread
+    out across the graph instead of clustering around one hub.
+    """
+    people = sorted(range(len(graph.person_ids)),
+                    key=lambda person: len(graph.movies_of(person)),
+                    reverse=True)
+    chosen = []
+    covered = set()
+    for person in people:
+        if len(chosen) == count or not len(graph.movies_of(person)):
+            break
+        if person in covered:
+            continue
+        chosen.append(person)
+        for _, other in graph.neighbors(person):
+            covered.add(other)
+    return chosen
+
+
+def load_index(directory, graph, count=16):
+    """
+    Returns the LandmarkIndex for a directory, reusing the one saved on
+    disk while the CSV files are unchanged and rebuilding it otherwise.
+    """
+    path = os.path.join(directory, FILENAME)
+    try:
+        header, index = LandmarkIndex.load(graph, path)
+        if (len(index.landmarks) == count
+                and snapshot.is_fresh(directory, header["sources"])):
+            return index
+    except (OSError, snapshot.SnapshotError, KeyError, ValueError,
+            TypeError):
+        pass
+
+    header = snapshot.header_for(directory)
+    index = LandmarkIndex.build(graph, count)
+    try:
+        index.save(path, header)
+    except OSError:
+        pass
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the landmark distance index for a dataset."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--count", type=int, default=16,
+                        help="number of landmarks")
+    args = parser.parse_args()
+
+    graph = snapshot.load_graph(args.directory)
+    index = load_index(args.directory, graph, args.count)
+    print(f"{len(index.landmarks)} landmarks over "
+          f"{len(graph.person_ids)} people")
+
+
+if __name__ == "__main__":
+    main()
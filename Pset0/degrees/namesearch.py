@@ -0,0 +1,325 @@
+"""
+Prefix and typo-tolerant lookup over every person's name, without prompts.
+
+Prefix matches come from a binary search over the graph's name order.
+Misspellings are found word by word. Every word of every name is indexed
+under itself and under each way of deleting one of its letters, so two
+words one edit apart always share a key, and only names made of words
+close to the query's words are compared with the query in full.
+
+Usage: python namesearch.py [directory] query [--birth YEAR]
+"""
+
+import argparse
+import bisect
+import os
+from array import array
+from collections import namedtuple
+
+import snapshot
+from graph import INDEX, StringTable, StringTableBuilder
+
+FILENAME = "names.snapshot"
+KIND = "names"
+
+# Sections a NameIndex is made of, besides its two string tables
+SECTIONS = ("group_starts", "word_offsets", "word_groups",
+            "deletion_offsets", "deletion_words")
+
+# Words shorter than this get no deleted-letter variants, so a short
+# query word only matches itself or a vocabulary word one letter longer
+MIN_FUZZY_LENGTH = 3
+
+Candidate = namedtuple("Candidate", "person_id name birth distance")
+
+
+class NameIndex():
+    """
+    Word and deletion postings over the distinct lowercase names of a
+    StarGraph.
+
+    Distinct name g is shared by the people at
+    graph.name_order[group_starts[g]:group_starts[g + 1]].
+    word_groups[word_offsets[w]:word_offsets[w + 1]] are the names that
+    contain words[w], and deletion_words lists the words each of
+    deletions is a variant of in the same way.
+    """
+
+    def __init__(self, graph, words, deletions, sections):
+        self.graph = graph
+        self.words = words
+        self.deletions = deletions
+        self.sections = sections
+        for name in SECTIONS:
+            setattr(self, name, sections[name])
+
+    @classmethod
+    def build(cls, graph):
+        group_starts = array(INDEX)
+        word_groups = {}
+        previous = None
+        for position, person in enumerate(graph.name_order):
+            name = graph.lower_name(person)
+            if name == previous:
+                continue
+            previous = name
+            group = len(group_starts)
+            group_starts.append(position)
+            for word in set(name.split()):
+                word_groups.setdefault(word, array(INDEX)).append(group)
+        group_starts.append(len(graph.name_order))
+
+        words = sorted(word_groups)
+        deletion_words = {}
+        for word_index, word in enumerate(words):
+            for variant in variants(word):
+                deletion_words.setdefault(variant, array(INDEX)).append(
+                    word_index
+                )
+
+        word_table, word_offsets, word_postings = build_postings(
+            words, word_groups
+        )
+        deletion_table, deletion_offsets, deletion_postings = build_postings(
+            sorted(deletion_words), deletion_words
+        )
+        return cls(graph, word_table, deletion_table, {
+            "group_starts": memoryview(group_starts),
+            "word_offsets": word_offsets,
+            "word_groups": word_postings,
+            "deletion_offsets": deletion_offsets,
+            "deletion_words": deletion_postings,
+        })
+
+    def group_name(self, group):
+        return self.graph.lower_name(
+            self.graph.name_order[self.group_starts[group]]
+        )
+
+    def group_people(self, group):
+        return self.graph.name_order[self.group_starts[group]:
+                                     self.group_starts[group + 1]]
+
+    def groups_with(self, word):
+        """Returns the distinct names containing the word with index word."""
+        return self.word_groups[self.word_offsets[word]:
+                                self.word_offsets[word + 1]]
+
+    def words_with(self, variant):
+        """Returns the indices of the words variant was derived from."""
+        position = bisect.bisect_left(self.deletions, variant)
+        if (position == len(self.deletions)
+                or self.deletions[position] != variant):
+            return self.deletion_words[0:0]
+        return self.deletion_words[self.deletion_offsets[position]:
+                                   self.deletion_offsets[position + 1]]
+
+    def prefix(self, query, limit):
+        """
+        Returns up to limit people whose lowercase name starts with query.
+        """
+        order = self.graph.name_order
+        key = self.graph.lower_name
+        start = bisect.bisect_left(order, query, key=key)
+        people = []
+        for position in range(start, min(start + limit, len(order))):
+            if not key(order[position]).startswith(query):
+                break
+            people.append(order[position])
+        return people
+
+    def similar_words(self, word):
+        """
+        Returns the set of vocabulary words within one edit of word.
+        """
+        if len(word) < MIN_FUZZY_LENGTH:
+            candidates = self.words_with(word)
+        else:
+            candidates = {index for variant in variants(word)
+                          for index in self.words_with(variant)}
+        return {index for index in candidates
+                if edit_distance(word, self.words[index], 1) is not None}
+
+    def fuzzy(self, query, max_edits):
+        """
+        Returns {group: distance} for the distinct names within max_edits
+        edits of query, made of words each within one edit of the
+        matching query word.
+        """
+        alternatives = [self.similar_words(word) for word in query.split()]
+        if not all(alternatives):
+            return {}
+        allowed = [{self.words[index] for index in similar}
+                   for similar in alternatives]
+
+        # Only scan names containing a match for the most selective word
+        driver = min(alternatives, key=lambda similar: sum(
+            len(self.groups_with(index)) for index in similar
+        ))
+        matches = {}
+        for index in driver:
+            for group in self.groups_with(index):
+                if group in matches:
+                    continue
+                name = self.group_name(group)
+                words = name.split()
+                if len(words) != len(allowed) or not all(
+                    word in options for word, options in zip(words, allowed)
+                ):
+                    matches[group] = None
+                    continue
+                matches[group] = edit_distance(query, name, max_edits)
+        return {group: distance for group, distance in matches.items()
+                if distance is not None}
+
+    def search(self, query, birth=None, limit=10, max_edits=2):
+        """
+        Returns up to limit Candidates for query, best first.
+
+        Exact matches rank first, then prefix matches, then misspellings
+        by edit distance. Among equally good names, people born in birth
+        come first, so a name plus birth year picks out one person.
+        """
+        query = " ".join(query.lower().split())
+        if not query:
+            return []
+        graph = self.graph
+
+        # Ranks people by (tier, edits): exact, then prefix, then fuzzy
+        ranks = {person: (0, 0) for person in graph.people_named(query)}
+        for person in self.prefix(query, limit):
+            ranks.setdefault(person, (1, 0))
+        if len(ranks) < limit:
+            for group, distance in self.fuzzy(query, max_edits).items():
+                for person in self.group_people(group):
+                    ranks.setdefault(person, (2, distance))
+
+        birth = None if birth is None else str(birth)
+
+        def order(person):
+            return (ranks[person],
+                    birth is not None and graph.person_births[person] != birth,
+                    graph.person_names[person])
+
+        return [Candidate(graph.person_ids[person], graph.person_names[person],
+                          graph.person_births[person], ranks[person][1])
+                for person in sorted(ranks, key=order)[:limit]]
+
+    def save(self, path, header):
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            writer = snapshot.SnapshotWriter(temporary)
+            for name, table in (("words", self.words),
+                                ("deletions", self.deletions)):
+                writer.add(f"{name}.data", table.data)
+                writer.add(f"{name}.offsets", table.offsets)
+            for name in SECTIONS:
+                writer.add(name, self.sections[name])
+            writer.close(dict(header, kind=KIND))
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    @classmethod
+    def load(cls, graph, path):
+        header, sections = snapshot.open_sections(path)
+        if header.get("kind") != KIND:
+            raise snapshot.SnapshotError(f"{path} is not a name index")
+        words = StringTable(sections["words.data"], sections["words.offsets"])
+        deletions = StringTable(sections["deletions.data"],
+                                sections["deletions.offsets"])
+        return header, cls(graph, words, deletions, sections)
+
+
+def build_postings(keys, postings):
+    """
+    Packs sorted keys into a StringTable and their postings into CSR
+    arrays in the same order.
+    """
+    table = StringTableBuilder()
+    offsets = array(INDEX, [0])
+    flat = array(INDEX)
+    for key in keys:
+        table.append(key)
+        flat.extend(postings[key])
+        offsets.append(len(flat))
+    return table.build(), memoryview(offsets), memoryview(flat)
+
+
+def variants(word):
+    """
+    Returns word and every string made by deleting one of its letters,
+    or just word if it is shorter than MIN_FUZZY_LENGTH.
+    """
+    if len(word) < MIN_FUZZY_LENGTH:
+        return {word}
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def edit_distance(a, b, limit):
+    """
+    Returns the edit distance between a and b, counting insertions,
+    deletions, substitutions and swaps of adjacent letters, or None if it
+    is more than limit. Only cells within limit of the diagonal are filled.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return None
+    beyond = limit + 1
+    before = None
+    previous = [j if j <= limit else beyond for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [i if i <= limit else beyond] + [beyond] * len(b)
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1,
+                       previous[j - 1] + (a[i - 1] != b[j - 1]), beyond)
+            if (i > 1 and j > 1 and a[i - 1] == b[j - 2]
+                    and a[i - 2] == b[j - 1]):
+                cost = min(cost, before[j - 2] + 1)
+            current[j] = cost
+        if min(current) > limit:
+            return None
+        before, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else None
+
+
+def load_index(directory, graph):
+    """
+    Returns the NameIndex for a directory, reusing the one saved on disk
+    while the CSV files are unchanged and rebuilding it otherwise.
+    """
+    path = os.path.join(directory, FILENAME)
+    try:
+        header, index = NameIndex.load(graph, path)
+        if snapshot.is_fresh(directory, header["sources"]):
+            return index
+    except (OSError, snapshot.SnapshotError, KeyError, ValueError,
+            TypeError):
+        pass
+
+    header = snapshot.header_for(directory)
+    index = NameIndex.build(graph)
+    try:
+        index.save(path, header)
+    except OSError:
+        pass
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search person names.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("query")
+    parser.add_argument("--birth", help="preferred birth year")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    graph = snapshot.load_graph(args.directory)
+    index = load_index(args.directory, graph)
+    for candidate in index.search(args.query, args.birth, args.limit):
+        print(f"ID: {candidate.person_id}, Name: {candidate.name}, "
+              f"Birth: {candidate.birth}, Distance: {candidate.distance}")
+
+
+if __name__ == "__main__":
+    main()
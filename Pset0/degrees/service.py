@@ -0,0 +1,289 @@
+"""
+Batch and server front ends that answer many degrees queries per load.
+
+Usage: python service.py batch [--directory DIR] [file]
+       python service.py serve [--directory DIR] [--port PORT | --socket PATH]
+
+Queries are either JSON objects {"source": name, "target": name} or two
+names separated by a tab, one per line. JSON queries may also give
+"source_birth" and "target_birth" years to pick between people with the
+same name. Answers are JSON lines.
+"""
+
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+import namesearch
+
+# Fuzzy name index over the loaded graph, set by main
+name_index = None
+
+
+class QueryStats():
+    """
+    Counts queries answered since start, safe to share between threads.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.lock = threading.Lock()
+
+    def record(self):
+        with self.lock:
+            self.queries += 1
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        return {
+            "queries": self.queries,
+            "seconds": round(elapsed, 3),
+            "queries_per_second": round(self.queries / elapsed, 1)
+            if elapsed else 0.0,
+        }
+
+
+def resolve(name, birth=None):
+    """
+    Returns (person_id, error) for a name, never prompting.
+    A birth year narrows down people sharing the name. Names that are
+    still ambiguous are an error listing every candidate, and unknown
+    names are an error listing the closest spellings when an index is
+    loaded.
+    """
+    person_ids = sorted(degrees.names.get(name.lower(), set()))
+    if birth is not None:
+        born = [person_id for person_id in person_ids
+                if degrees.people[person_id]["birth"] == str(birth)]
+        person_ids = born or person_ids
+    if not person_ids:
+        error = {"error": "person not found", "name": name}
+        if name_index is not None:
+            error["suggestions"] = [
+                candidate._asdict()
+                for candidate in name_index.search(name, birth, limit=5)
+            ]
+        return None, error
+    if len(person_ids) > 1:
+        candidates = []
+        for person_id in person_ids:
+            person = degrees.people[person_id]
+            candidates.append({"id": person_id, "name": person["name"],
+                               "birth": person["birth"]})
+        return None, {"error": "ambiguous name", "name": name,
+                      "candidates": candidates}
+    return person_ids[0], None
+
+
+def answer(source_name, target_name, source_birth=None, target_birth=None):
+    """
+    Answers one query as a JSON-serialisable dict.
+    """
+    source, error = resolve(source_name, source_birth)
+    if error:
+        return error
+    target, error = resolve(target_name, target_birth)
+    if error:
+        return error
+
+    path = degrees.shortest_path(source, target)
+    response = {"source": source_name, "target": target_name}
+    if path is None:
+        response["degrees"] = None
+        return response
+    response["degrees"] = len(path)
+    response["path"] = []
+    previous = source
+    for movie_id, person_id in path:
+        response["path"].append({
+            "from": degrees.people[previous]["name"],
+            "to": degrees.people[person_id]["name"],
+            "movie": degrees.movies[movie_id]["title"],
+        })
+        previous = person_id
+    return response
+
+
+def answer_line(line):
+    """
+    Parses one query line and answers it, or returns None for blank lines.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        try:
+            query = json.loads(line)
+            return answer(query["source"], query["target"],
+                          query.get("source_birth"),
+                          query.get("target_birth"))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return {"error": "malformed query", "query": line}
+    names = line.split("\t")
+    if len(names) != 2:
+        return {"error": "malformed query", "query": line}
+    return answer(names[0].strip(), names[1].strip())
+
+
+def run_batch(lines, out):
+    """
+    Answers every query in lines, streaming one JSON line each to out.
+    Returns the QueryStats for the run.
+    """
+    stats = QueryStats()
+    for line in lines:
+        response = answer_line(line)
+        if response is None:
+            continue
+        stats.record()
+        out.write(json.dumps(response) + "\n")
+        out.flush()
+    return stats
+
+
+def first(query, key):
+    """Returns the first value of a parsed query string key, or None."""
+    return query.get(key, [None])[0]
+
+
+def http_handler(stats):
+    """
+    Returns a request handler class serving /degrees and /stats.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == "/stats":
+                self.reply(200, stats.summary())
+            elif url.path == "/degrees":
+                try:
+                    source, = query["source"]
+                    target, = query["target"]
+                except (KeyError, ValueError):
+                    self.reply(400, {"error": "need source and target"})
+                    return
+                response = answer(source, target,
+                                  first(query, "source_birth"),
+                                  first(query, "target_birth"))
+                stats.record()
+                self.reply(200, response)
+            else:
+                self.reply(404, {"error": "not found"})
+
+        def reply(self, status, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def socket_handler(stats):
+    """
+    Returns a handler answering JSON lines over a stream socket.
+    """
+
+    class Handler(socketserver.StreamRequestHandler):
+
+        def handle(self):
+            for line in self.rfile:
+                line = line.decode("utf-8")
+                if line.strip() == "stats":
+                    response = stats.summary()
+                else:
+                    response = answer_line(line)
+                    if response is None:
+                        continue
+                    stats.record()
+                self.wfile.write((json.dumps(response) + "\n")
+                                 .encode("utf-8"))
+
+    return Handler
+
+
+class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(port=None, socket_path=None):
+    """
+    Serves queries until interrupted, over HTTP on localhost:port or
+    over a Unix socket at socket_path.
+    """
+    stats = QueryStats()
+    if socket_path is not None:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = UnixServer(socket_path, socket_handler(stats))
+        print(f"Serving on {socket_path}", file=sys.stderr)
+    else:
+        server = ThreadingHTTPServer(("127.0.0.1", port), http_handler(stats))
+        print(f"Serving on http://127.0.0.1:{server.server_address[1]}",
+              file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path is not None and os.path.exists(socket_path):
+            os.remove(socket_path)
+        print(json.dumps(stats.summary()), file=sys.stderr)
+
+
+def main():
+    global name_index
+
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees queries per data load."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="answer queries from a file")
+    batch.add_argument("--directory", default="large")
+    batch.add_argument("file", nargs="?", default="-",
+                       help="query file, or - for stdin")
+
+    server = commands.add_parser("serve", help="keep the graph resident")
+    server.add_argument("--directory", default="large")
+    where = server.add_mutually_exclusive_group()
+    where.add_argument("--port", type=int, default=8000)
+    where.add_argument("--socket", dest="socket_path")
+
+    args = parser.parse_args()
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory)
+    name_index = namesearch.load_index(args.directory, degrees.graph)
+    print("Data loaded.", file=sys.stderr)
+
+    if args.command == "batch":
+        if args.file == "-":
+            stats = run_batch(sys.stdin, sys.stdout)
+        else:
+            with open(args.file, encoding="utf-8") as f:
+                stats = run_batch(f, sys.stdout)
+        print(json.dumps(stats.summary()), file=sys.stderr)
+    else:
+        serve(port=args.port, socket_path=args.socket_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Versioned binary snapshots of a StarGraph, stored next to the CSV files.
+
+A snapshot is a small preamble, a run of 8-byte aligned raw arrays and a
+JSON header describing them. Opening one maps the file into memory and
+wraps each array in a memoryview, so nothing is read until it is used.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+from graph import COLUMNS, StarGraph, StringTable
+
+MAGIC = b"DEGREES\0"
+VERSION = 1
+FILENAME = "degrees.snapshot"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# Magic, then offset and length of the JSON header
+PREAMBLE = struct.Struct("<8sQQ")
+ALIGNMENT = 8
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class SnapshotWriter():
+    """
+    Writes named arrays to a snapshot file one after another.
+    The header goes last, so sections can be streamed without knowing
+    their sizes up front.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "wb")
+        self.file.write(bytes(PREAMBLE.size))
+        self.sections = {}
+
+    def add(self, name, buffer):
+        """Appends a whole array, bytes object or memoryview as a section."""
+        self.begin(name, memoryview(buffer).format)
+        self.extend(buffer)
+        self.end()
+
+    def begin(self, name, format):
+        """Starts a section that is then filled by calls to extend."""
+        padding = -self.file.tell() % ALIGNMENT
+        self.file.write(bytes(padding))
+        self.sections[name] = [self.file.tell(), 0, format]
+        self.current = name
+
+    def extend(self, buffer):
+        self.file.write(memoryview(buffer).cast("B"))
+
+    def end(self):
+        section = self.sections[self.current]
+        section[1] = self.file.tell() - section[0]
+        self.current = None
+
+    def close(self, header):
+        """Writes header and the section table, then the preamble."""
+        header = dict(header, sections=self.sections)
+        data = json.dumps(header).encode("utf-8")
+        offset = self.file.tell()
+        self.file.write(data)
+        self.file.seek(0)
+        self.file.write(PREAMBLE.pack(MAGIC, offset, len(data)))
+        self.file.close()
+
+
+def open_sections(path):
+    """
+    Maps a snapshot file into memory.
+    Returns its header and a dict of section name to memoryview.
+    """
+    with open(path, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise SnapshotError(f"{path} is empty")
+    view = memoryview(buffer)
+    if len(view) < PREAMBLE.size:
+        raise SnapshotError(f"{path} is truncated")
+    magic, offset, length = PREAMBLE.unpack(view[:PREAMBLE.size])
+    if magic != MAGIC or offset + length > len(view):
+        raise SnapshotError(f"{path} is not a snapshot")
+    header = json.loads(str(view[offset:offset + length], "utf-8"))
+    if header.get("version") != VERSION:
+        raise SnapshotError(f"{path} has version {header.get('version')}")
+    if header.get("byteorder") != sys.byteorder:
+        raise SnapshotError(f"{path} was written on a different platform")
+
+    sections = {}
+    for name, (start, size, format) in header["sections"].items():
+        sections[name] = view[start:start + size].cast(format)
+    return header, sections
+
+
+def fingerprint(path):
+    """Returns the size, mtime and SHA-256 digest of a source file."""
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": digest.hexdigest(),
+    }
+
+
+def is_fresh(directory, sources):
+    """
+    Checks recorded fingerprints against the CSV files on disk.
+    Files whose mtime changed are only stale if their contents did too.
+    """
+    for filename in SOURCES:
+        recorded = sources.get(filename)
+        if recorded is None:
+            return False
+        path = os.path.join(directory, filename)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if (stat.st_size, stat.st_mtime_ns) == (recorded["size"],
+                                                recorded["mtime_ns"]):
+            continue
+        if (stat.st_size != recorded["size"]
+                or fingerprint(path)["sha256"] != recorded["sha256"]):
+            return False
+    return True
+
+
+def header_for(directory):
+    return {
+        "version": VERSION,
+        "byteorder": sys.byteorder,
+        "sources": {
+            filename: fingerprint(os.path.join(directory, filename))
+            for filename in SOURCES
+        },
+    }
+
+
+def save(graph, path, header):
+    """
+    Writes graph to path, replacing any existing snapshot atomically.
+    """
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        writer = SnapshotWriter(temporary)
+        for name in COLUMNS:
+            column = graph.columns[name]
+            if isinstance(column, StringTable):
+                writer.add(f"{name}.data", column.data)
+                writer.add(f"{name}.offsets", column.offsets)
+            else:
+                writer.add(name, column)
+        writer.close(header)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def load(path):
+    """
+    Opens a snapshot as a StarGraph whose columns are views of the file.
+    """
+    header, sections = open_sections(path)
+    columns = {}
+    for name in COLUMNS:
+        if name in sections:
+            columns[name] = sections[name]
+        else:
+            columns[name] = StringTable(sections[f"{name}.data"],
+                                        sections[f"{name}.offsets"])
+    return header, StarGraph(columns)
+
+
+def load_graph(directory):
+    """
+    Returns the StarGraph for a directory of CSV files, reusing its
+    snapshot when it is up to date and rebuilding it otherwise.
+    """
+    path = os.path.join(directory, FILENAME)
+    try:
+        header, graph = load(path)
+        if is_fresh(directory, header["sources"]):
+            return graph
+    except (OSError, SnapshotError, KeyError, ValueError, TypeError):
+        pass
+
+    header = header_for(directory)
+    graph = StarGraph.from_csv(directory)
+    try:
+        save(graph, path, header)
+    except OSError:
+        # Read-only data directories still work, just without the cache
+        pass
+    return graph
@@ -1,3 +1,6 @@
+from collections import Counter, deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -6,14 +9,23 @@ class Node():
 
 
 class StackFrontier():
+    """
+    Last-in first-out frontier.
+
+    Nodes are kept in a deque and their states are counted alongside,
+    so add, remove, empty and contains_state all run in O(1).
+    """
+
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        self.states = Counter()
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] += 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return self.states[state] > 0
 
     def empty(self):
         return len(self.frontier) == 0
@@ -22,17 +34,184 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
-            return node
+            return self.forget(self.frontier.pop())
+
+    def forget(self, node):
+        """Drops a node that just left the frontier from the state counts."""
+        count = self.states[node.state] - 1
+        if count:
+            self.states[node.state] = count
+        else:
+            del self.states[node.state]
+        return node
 
 
 class QueueFrontier(StackFrontier):
+    """
+    First-in first-out frontier.
+    """
 
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
-            return node
+            return self.forget(self.frontier.popleft())
+
+
+def bidirectional_search(source, target, neighbors, max_length=None):
+    """
+    Returns the shortest list of (action, state) pairs leading from
+    source to target, searching outward from both ends at once.
+
+    `neighbors(state)` must return (action, state) pairs of an undirected
+    graph. Each round expands one whole layer of whichever side has the
+    smaller frontier, and the search stops as soon as the two sides meet.
+
+    If target cannot be reached, or max_length is given and every path
+    is longer than it, returns None.
+    """
+    if source == target:
+        return []
+
+    # Maps every reached state to the (action, state) pair that reached it
+    forward = {source: None}
+    backward = {target: None}
+    forward_layer = [source]
+    backward_layer = [target]
+    # Paths found by the next expansion are one step longer than this
+    length = 0
+
+    while forward_layer and backward_layer:
+        if max_length is not None and length >= max_length:
+            return None
+        length += 1
+        if len(forward_layer) <= len(backward_layer):
+            forward_layer, meeting = expand_layer(
+                forward_layer, forward, backward, neighbors
+            )
+        else:
+            backward_layer, meeting = expand_layer(
+                backward_layer, backward, forward, neighbors
+            )
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+
+    return None
+
+
+def expand_layer(layer, reached, other, neighbors):
+    """
+    Expands every state in layer by one step, recording parents in reached.
+
+    Returns the next layer and the first state also reached by the other
+    side, or None if the two sides have not met yet. Because whole layers
+    are expanded in turn, the first meeting lies on a shortest path.
+    """
+    next_layer = []
+    for state in layer:
+        for action, neighbor in neighbors(state):
+            if neighbor in reached:
+                continue
+            reached[neighbor] = (action, state)
+            if neighbor in other:
+                return next_layer, neighbor
+            next_layer.append(neighbor)
+    return next_layer, None
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Stitches the two halves of a bidirectional search together at meeting.
+    """
+    path = []
+    state = meeting
+    while forward[state] is not None:
+        action, parent = forward[state]
+        path.append((action, state))
+        state = parent
+    path.reverse()
+
+    state = meeting
+    while backward[state] is not None:
+        action, child = backward[state]
+        path.append((action, child))
+        state = child
+    return path
+
+
+def all_shortest_paths(source, target, neighbors):
+    """
+    Yields every shortest list of (action, state) pairs leading from
+    source to target, one at a time, in no particular order.
+
+    A bidirectional search labels states with their distance from each
+    end, which fixes the layers of every shortest path. The paths are then
+    walked out of those labels lazily, so only the path being built is
+    held in memory however many paths there are. Yields nothing if target
+    cannot be reached.
+    """
+    if source == target:
+        yield []
+        return
+
+    forward = {source: 0}
+    backward = {target: 0}
+    forward_layer = [source]
+    backward_layer = [target]
+    middle = []
+    while forward_layer and backward_layer and not middle:
+        if len(forward_layer) <= len(backward_layer):
+            forward_layer, middle = label_layer(
+                forward_layer, forward, backward, neighbors
+            )
+        else:
+            backward_layer, middle = label_layer(
+                backward_layer, backward, forward, neighbors
+            )
+
+    # Every shortest path crosses the last layer at exactly one state
+    for state in middle:
+        for head in walk(state, forward, neighbors):
+            states = [state] + [step for _, step in head]
+            path = [(head[i][0], states[i])
+                    for i in reversed(range(len(head)))]
+            for tail in walk(state, backward, neighbors):
+                yield path + tail
+
+
+def label_layer(layer, distances, other, neighbors):
+    """
+    Labels every state one step beyond layer with its distance.
+
+    Returns the next layer and the states in it that lie on a shortest
+    path between the two ends, if the two sides have met.
+    """
+    depth = distances[layer[0]] + 1
+    next_layer = []
+    for state in layer:
+        for _, neighbor in neighbors(state):
+            if neighbor not in distances:
+                distances[neighbor] = depth
+                next_layer.append(neighbor)
+
+    meetings = [state for state in next_layer if state in other]
+    if not meetings:
+        return next_layer, []
+    nearest = min(other[state] for state in meetings)
+    return next_layer, [state for state in meetings
+                        if other[state] == nearest]
+
+
+def walk(state, distances, neighbors):
+    """
+    Yields every list of (action, state) steps leading from state down
+    the distance labels to the end they were measured from.
+    """
+    depth = distances[state]
+    if depth == 0:
+        yield []
+        return
+    for action, neighbor in neighbors(state):
+        if distances.get(neighbor) == depth - 1:
+            for rest in walk(neighbor, distances, neighbors):
+                yield [(action, neighbor)] + rest
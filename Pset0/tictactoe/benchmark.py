@@ -0,0 +1,227 @@
+"""
+Benchmarks for the tictactoe search code.
+
+Usage: python benchmark.py search
+       python benchmark.py backends [--rounds N]
+       python benchmark.py mnk [--size M N K] [--budget SECONDS]
+       python benchmark.py allocations
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import bitboard
+import mnk
+import tictactoe as ttt
+
+
+def exhaustive_search(board):
+    """
+    The original exhaustive minimax, kept here only as a baseline: it
+    evaluates every child of every position. Returns (value, nodes).
+    """
+    stats = {"nodes": 0}
+
+    def value(board):
+        stats["nodes"] += 1
+        if ttt.terminal(board):
+            return ttt.utility(board)
+        children = [value(ttt.result(board, action))
+                    for action in ttt.actions(board)]
+        return max(children) if ttt.player(board) == ttt.X else min(children)
+
+    return value(board), stats["nodes"]
+
+
+def exhaustive_inplace(board):
+    """
+    The same full-tree minimax with make/unmake moves on one copy of the
+    board. Returns (value, nodes).
+    """
+    stats = {"nodes": 0}
+    board = ttt.copy_board(board)
+
+    def value(turn):
+        stats["nodes"] += 1
+        if ttt.terminal(board):
+            return ttt.utility(board)
+        best = None
+        for action in ttt.ordered_actions(board):
+            ttt.make(board, action, turn)
+            child = value(ttt.O if turn == ttt.X else ttt.X)
+            ttt.unmake(board, action)
+            if best is None or (child > best if turn == ttt.X
+                                else child < best):
+                best = child
+        return best
+
+    return value(ttt.player(board)), stats["nodes"]
+
+
+def reachable_positions():
+    """
+    Returns every board reachable from the empty board by legal play,
+    terminal ones included.
+    """
+    seen = {}
+    stack = [ttt.initial_state()]
+    while stack:
+        board = stack.pop()
+        key = ttt.board_key(board)
+        if key in seen:
+            continue
+        seen[key] = board
+        if not ttt.terminal(board):
+            for action in ttt.actions(board):
+                stack.append(ttt.result(board, action))
+    return list(seen.values())
+
+
+def bench_search():
+    """
+    Solves every reachable position with exhaustive minimax and with
+    alpha-beta, checks they agree on the value and that alpha-beta's
+    action is optimal, and prints nodes searched and wall time for each.
+    """
+    positions = [board for board in reachable_positions()
+                 if not ttt.terminal(board)]
+
+    start = time.perf_counter()
+    baseline = [exhaustive_search(board) for board in positions]
+    exhaustive_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pruned = [ttt.alphabeta_search(board) for board in positions]
+    alphabeta_time = time.perf_counter() - start
+
+    for board, (value, _), (pruned_value, action, _) in zip(positions,
+                                                            baseline, pruned):
+        assert pruned_value == value
+        assert ttt.solve(ttt.board_key(ttt.result(board, action)))[0] == value
+
+    exhaustive_nodes = sum(nodes for _, nodes in baseline)
+    alphabeta_nodes = sum(nodes for _, _, nodes in pruned)
+    print(f"{len(positions)} non-terminal positions, all actions optimal")
+    print(f"{'search':>12} {'nodes':>12} {'seconds':>10}")
+    print(f"{'exhaustive':>12} {exhaustive_nodes:>12} "
+          f"{exhaustive_time:>10.3f}")
+    print(f"{'alpha-beta':>12} {alphabeta_nodes:>12} "
+          f"{alphabeta_time:>10.3f}")
+    print(f"alpha-beta searches {alphabeta_nodes / exhaustive_nodes:.2%} "
+          f"of the nodes in {alphabeta_time / exhaustive_time:.2%} "
+          f"of the time")
+
+
+def bench_backends(rounds):
+    """
+    Times winner, terminal and actions over every reachable position on
+    list-of-lists boards and on bitboards, after checking they agree.
+    """
+    boards = reachable_positions()
+    states = [bitboard.from_board(board) for board in boards]
+    for board, state in zip(boards, states):
+        assert bitboard.to_board(state) == board
+        assert bitboard.winner(state) == ttt.winner(board)
+        assert bitboard.terminal(state) == ttt.terminal(board)
+        assert bitboard.actions(state) == ttt.actions(board)
+
+    print(f"{'backend':>10} {'us/position':>12}")
+    for label, backend, positions in (("lists", ttt, boards),
+                                      ("bitboard", bitboard, states)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for position in positions:
+                backend.winner(position)
+                backend.terminal(position)
+                backend.actions(position)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>10} {elapsed / rounds / len(positions) * 1e6:>12.2f}")
+
+
+def bench_mnk(rows, columns, k, budget):
+    """
+    Plays one game of the m,n,k engine against itself and prints the
+    depth reached, speed and latency of every move.
+    """
+    board = mnk.Board(rows, columns, k)
+    print(f"{'move':>5} {'cell':>8} {'depth':>6} {'nodes':>9} "
+          f"{'nodes/s':>9} {'seconds':>8}")
+    while not board.terminal():
+        start = time.perf_counter()
+        cell, _, depth, nodes = mnk.search(board, budget)
+        elapsed = time.perf_counter() - start
+        board.play(cell)
+        print(f"{board.filled:>5} {str(divmod(cell, columns)):>8} "
+              f"{depth:>6} {nodes:>9} {nodes / elapsed:>9.0f} "
+              f"{elapsed:>8.3f}")
+    print(f"winner: {board.won or 'none'}")
+
+
+def bench_allocations():
+    """
+    Runs full-tree searches from the empty board under tracemalloc,
+    with a fresh board per node and with make/unmake on one board, and
+    counts the boards each copies through tictactoe.copy_board.
+    """
+    copy_board = ttt.copy_board
+    counts = {"copies": 0}
+
+    def counting_copy(board):
+        counts["copies"] += 1
+        return copy_board(board)
+
+    print(f"{'search':>22} {'nodes':>9} {'boards copied':>14} "
+          f"{'peak KiB':>9} {'seconds':>8}")
+    for label, search in (
+        ("exhaustive, copying", exhaustive_search),
+        ("exhaustive, in place", exhaustive_inplace),
+        ("alpha-beta, in place",
+         lambda board: ttt.alphabeta_search(board)[::2]),
+    ):
+        counts["copies"] = 0
+        ttt.copy_board = counting_copy
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            _, nodes = search(ttt.initial_state())
+        finally:
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            ttt.copy_board = copy_board
+        print(f"{label:>22} {nodes:>9} {counts['copies']:>14} "
+              f"{peak / 1024:>9.1f} {elapsed:>8.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("search", help="alpha-beta against exhaustive minimax")
+
+    backends = commands.add_parser("backends", help="lists against bitboards")
+    backends.add_argument("--rounds", type=int, default=20)
+
+    engine = commands.add_parser("mnk", help="m,n,k engine self-play")
+    engine.add_argument("--size", type=int, nargs=3, default=[5, 5, 4],
+                        metavar=("M", "N", "K"))
+    engine.add_argument("--budget", type=float, default=1.0,
+                        help="seconds per move")
+
+    commands.add_parser("allocations", help="copying against make/unmake")
+
+    args = parser.parse_args()
+    if args.command == "search":
+        bench_search()
+    elif args.command == "backends":
+        bench_backends(args.rounds)
+    elif args.command == "mnk":
+        bench_mnk(*args.size, args.budget)
+    elif args.command == "allocations":
+        bench_allocations()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Tic Tac Toe Player on bitboards
+
+A state is a pair of 9-bit ints (x, o), one per player, where bit
+3 * i + j is set when that player holds cell (i, j). Win detection is a
+mask test against the 8 lines and legal moves come from a bit scan of the
+empty cells, both precomputed for all 512 cell sets so that each costs
+one table lookup. The functions mirror tictactoe.py, and from_board and
+to_board convert between the two representations.
+"""
+
+import functools
+
+from tictactoe import X, O, EMPTY
+
+# Every cell set
+FULL = 0b111_111_111
+
+# One mask per row, column and diagonal
+WIN_MASKS = (0b000_000_111, 0b000_111_000, 0b111_000_000,
+             0b001_001_001, 0b010_010_010, 0b100_100_100,
+             0b100_010_001, 0b001_010_100)
+
+
+def scan(bits):
+    """
+    Yields the index of every set bit, lowest first.
+    """
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+# Indexed by a 9-bit cell set: whether it covers a line, its cells as
+# bit indices and as (i, j) actions
+LINE = tuple(any(bits & mask == mask for mask in WIN_MASKS)
+             for bits in range(FULL + 1))
+CELLS = tuple(tuple(scan(bits)) for bits in range(FULL + 1))
+ACTIONS = tuple(frozenset(divmod(cell, 3) for cell in cells)
+                for cells in CELLS)
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return 0, 0
+
+
+def from_board(board):
+    """
+    Returns the bitboard state for a list-of-lists board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def to_board(state):
+    """
+    Returns the list-of-lists board for a bitboard state.
+    """
+    x, o = state
+    return [[X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1
+             else EMPTY for j in range(3)] for i in range(3)]
+
+
+def player(state):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x, o = state
+    return X if x.bit_count() <= o.bit_count() else O
+
+
+def moves(state):
+    """
+    Returns the bit index of every empty cell, lowest first.
+    """
+    x, o = state
+    return CELLS[FULL & ~(x | o)]
+
+
+def actions(state):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    x, o = state
+    return set(ACTIONS[FULL & ~(x | o)])
+
+
+def result(state, move):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    i, j = move
+    if not (0 <= i < 3 and 0 <= j < 3):
+        raise ValueError("Move out of bounds")
+    bit = 1 << (3 * i + j)
+    x, o = state
+    if (x | o) & bit:
+        raise ValueError("Invalid move: Cell is already occupied")
+    return (x | bit, o) if player(state) == X else (x, o | bit)
+
+
+def winner(state):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = state
+    if LINE[x]:
+        return X
+    if LINE[o]:
+        return O
+    return None
+
+
+def terminal(state):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = state
+    return (x | o) == FULL or LINE[x] or LINE[o]
+
+
+def utility(state):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    win = winner(state)
+    if win == X:
+        return 1
+    elif win == O:
+        return -1
+    return 0
+
+
+def minimax(state):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    if terminal(state):
+        return None
+    return solve(*state)[1]
+
+
+@functools.lru_cache(maxsize=None)
+def solve(x, o):
+    """
+    Returns (value, action) for the bitboard (x, o) under perfect play,
+    with action None on terminal boards.
+    """
+    state = (x, o)
+    if terminal(state):
+        return utility(state), None
+
+    x_turn = player(state) == X
+    best = None
+    for cell in moves(state):
+        bit = 1 << cell
+        value, _ = solve(x | bit, o) if x_turn else solve(x, o | bit)
+        if best is None or (value > best[0] if x_turn else value < best[0]):
+            best = (value, divmod(cell, 3))
+    return best
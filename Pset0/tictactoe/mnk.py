@@ -0,0 +1,246 @@
+"""
+Tic Tac Toe on m x n boards won by k in a row
+
+Exhaustive minimax is hopeless beyond 3 x 3, so moves are chosen by
+iterative-deepening alpha-beta under a time budget: each deeper search
+starts from the best move of the last one, and when the budget runs out
+the move from the deepest finished search is played. Positions beyond
+the search horizon are scored by a heuristic over every k-cell line.
+"""
+
+import math
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Score of a won position, well above any heuristic score
+WIN = 1 << 60
+
+# Nodes searched between checks of the clock
+CLOCK_INTERVAL = 1024
+
+# Directions a line can run in: across, down and both diagonals
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Board():
+    """
+    Mutable m x n board, played with play() and taken back with undo().
+
+    Cells are numbered row by row. The side to move and the winner are
+    kept up to date as moves are made, checking only the lines through
+    the last move.
+    """
+
+    def __init__(self, rows=3, columns=3, k=3):
+        if not 1 <= k <= max(rows, columns):
+            raise ValueError("k must fit on the board")
+        self.rows = rows
+        self.columns = columns
+        self.k = k
+        self.cells = [EMPTY] * (rows * columns)
+        self.turn = X
+        self.won = None
+        self.filled = 0
+        self.history = []
+
+        # Every k-cell line, for the heuristic
+        self.windows = []
+        for i in range(rows):
+            for j in range(columns):
+                for di, dj in DIRECTIONS:
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < rows and 0 <= end_j < columns:
+                        self.windows.append(tuple(
+                            (i + di * step) * columns + j + dj * step
+                            for step in range(k)
+                        ))
+
+        # Central cells first, since they lie on the most lines
+        middle_i, middle_j = (rows - 1) / 2, (columns - 1) / 2
+        self.order = sorted(
+            range(rows * columns),
+            key=lambda cell: (abs(cell // columns - middle_i)
+                              + abs(cell % columns - middle_j))
+        )
+
+    @classmethod
+    def from_board(cls, board, k=None):
+        """
+        Returns a Board holding a list-of-lists board, where k defaults
+        to the shorter side.
+        """
+        rows, columns = len(board), len(board[0])
+        game = cls(rows, columns, k or min(rows, columns))
+        x_count = o_count = 0
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell is not EMPTY:
+                    game.cells[i * columns + j] = cell
+                    game.filled += 1
+                    x_count += cell == X
+                    o_count += cell == O
+        game.turn = X if x_count <= o_count else O
+        for window in game.windows:
+            first = game.cells[window[0]]
+            if first is not EMPTY and all(game.cells[cell] == first
+                                          for cell in window):
+                game.won = first
+        return game
+
+    def moves(self):
+        """
+        Returns the empty cells, most central first.
+        """
+        cells = self.cells
+        return [cell for cell in self.order if cells[cell] is EMPTY]
+
+    def play(self, cell):
+        self.cells[cell] = self.turn
+        self.filled += 1
+        self.history.append(cell)
+        if self.wins(cell):
+            self.won = self.turn
+        self.turn = O if self.turn == X else X
+
+    def undo(self):
+        cell = self.history.pop()
+        self.turn = self.cells[cell]
+        self.cells[cell] = EMPTY
+        self.filled -= 1
+        self.won = None
+
+    def wins(self, cell):
+        """
+        Returns True if the stone on cell completes k in a row.
+        """
+        cells, columns, rows = self.cells, self.columns, self.rows
+        stone = cells[cell]
+        i, j = divmod(cell, columns)
+        for di, dj in DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                y, x = i + sign * di, j + sign * dj
+                while (0 <= y < rows and 0 <= x < columns
+                       and cells[y * columns + x] == stone):
+                    count += 1
+                    y, x = y + sign * di, x + sign * dj
+            if count >= self.k:
+                return True
+        return False
+
+    def terminal(self):
+        return self.won is not None or self.filled == len(self.cells)
+
+    def evaluate(self):
+        """
+        Scores the position for X: every line still open to only one
+        player counts 10 ** stones in X's favour or against it.
+        """
+        cells = self.cells
+        score = 0
+        for window in self.windows:
+            x_count = o_count = 0
+            for cell in window:
+                if cells[cell] == X:
+                    x_count += 1
+                elif cells[cell] == O:
+                    o_count += 1
+            if not o_count and x_count:
+                score += 10 ** x_count
+            elif not x_count and o_count:
+                score -= 10 ** o_count
+        return score
+
+
+def search(board, budget=1.0, max_depth=None):
+    """
+    Returns (cell, value, depth, nodes): the best move found for the side
+    to move within budget seconds, its score for that side, the deepest
+    search finished and the number of positions visited.
+
+    The board is left as it was. Returns a None cell on finished games.
+    """
+    if board.terminal():
+        return None, 0, 0, 0
+    deadline = time.perf_counter() + budget
+    stats = {"nodes": 0}
+    moves = board.moves()
+    best, value, finished = moves[0], 0, 0
+    max_depth = max_depth or len(moves)
+
+    for depth in range(1, max_depth + 1):
+        # Search the previous best move first, for earlier cutoffs
+        moves.remove(best)
+        moves.insert(0, best)
+        try:
+            value, best = search_root(board, moves, depth, deadline, stats)
+        except SearchTimeout:
+            break
+        finished = depth
+        if abs(value) >= WIN - len(board.cells):
+            break
+    return best, value, finished, stats["nodes"]
+
+
+def search_root(board, moves, depth, deadline, stats):
+    alpha, beta = -math.inf, math.inf
+    best = moves[0]
+    for cell in moves:
+        board.play(cell)
+        try:
+            score = -negamax(board, depth - 1, -beta, -alpha, deadline, stats)
+        finally:
+            board.undo()
+        if score > alpha:
+            alpha, best = score, cell
+    return alpha, best
+
+
+def negamax(board, depth, alpha, beta, deadline, stats):
+    """
+    Returns the alpha-beta score of the position for the side to move,
+    searching depth more moves. Raises SearchTimeout after deadline.
+    """
+    stats["nodes"] += 1
+    if (stats["nodes"] % CLOCK_INTERVAL == 0
+            and time.perf_counter() > deadline):
+        raise SearchTimeout()
+
+    # The last mover won: sooner losses score worse
+    if board.won is not None:
+        return board.filled - WIN
+    moves = board.moves()
+    if not moves:
+        return 0
+    if depth == 0:
+        return board.evaluate() if board.turn == X else -board.evaluate()
+
+    value = -math.inf
+    for cell in moves:
+        board.play(cell)
+        try:
+            score = -negamax(board, depth - 1, -beta, -alpha, deadline, stats)
+        finally:
+            board.undo()
+        if score > value:
+            value = score
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    break
+    return value
+
+
+def best_action(board, k=None, budget=1.0):
+    """
+    Returns an action (i, j) for the current player on a list-of-lists
+    board of any size, needing k in a row, chosen within budget seconds.
+    """
+    game = Board.from_board(board, k)
+    cell, _, _, _ = search(game, budget)
+    return None if cell is None else divmod(cell, game.columns)
@@ -1,12 +1,18 @@
 import pygame
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 
+import mnk
 import tictactoe as ttt
 
 pygame.init()
 size = width, height = 600, 400
 
+# Frames drawn per second, and seconds the AI may think per move
+FPS = 60
+AI_BUDGET = 1.0
+
 # Colors
 black = (0, 0, 0)
 white = (25, 255, 255)
@@ -19,12 +25,28 @@ moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+
+# The AI searches in a worker thread so the window keeps drawing
+clock = pygame.time.Clock()
+executor = ThreadPoolExecutor(max_workers=1)
+ai_move = None
+
+
+def choose_action(board):
+    """
+    Returns the AI's move: a perfect-play table lookup on 3 x 3 boards,
+    and a deadline-bound mnk search on anything larger.
+    """
+    if len(board) == 3 and len(board[0]) == 3:
+        return ttt.minimax(board)
+    return mnk.best_action(board, 3, AI_BUDGET)
+
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            executor.shutdown(wait=False, cancel_futures=True)
             sys.exit()
 
     screen.fill(black)
@@ -108,15 +130,13 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Start the AI search, then poll it once per frame
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai_move is None:
+                ai_move = executor.submit(choose_action, board)
+            elif ai_move.done():
+                board = ttt.result(board, ai_move.result())
+                ai_move = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -141,6 +161,7 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
+                    ai_move = None
 
     pygame.display.flip()
+    clock.tick(FPS)
@@ -0,0 +1,204 @@
+"""
+Headless self-play and position analysis for the tictactoe engines.
+
+Usage: python selfplay.py play [--games N] [--opponent ai|random]
+                               [--engine table|alphabeta|mnk] [--processes P]
+       python selfplay.py analyze [file] [--processes P]
+
+play prints a JSON summary of outcomes, games per second and nodes per
+second. analyze reads one position per line as 9 cells of X, O or .,
+optionally split into rows by /, and prints one JSON line per position
+followed by a summary on stderr.
+"""
+
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import time
+from collections import Counter
+
+import mnk
+import tictactoe as ttt
+
+ENGINES = ("table", "alphabeta", "mnk")
+
+
+def choose(board, engine, budget):
+    """
+    Returns (action, nodes) for the player to move, where nodes counts
+    the positions searched (0 for table lookups).
+    """
+    if engine == "table":
+        return ttt.minimax(board), 0
+    if engine == "alphabeta":
+        _, action, nodes = ttt.alphabeta_search(board)
+        return action, nodes
+    game = mnk.Board.from_board(board, 3)
+    cell, _, _, nodes = mnk.search(game, budget)
+    return divmod(cell, 3), nodes
+
+
+def play_games(task):
+    """
+    Worker task: plays games first to first + count - 1 and returns a
+    Counter of outcomes and search effort. Against the random opponent
+    the AI takes X in even games and O in odd ones.
+    """
+    first, count, opponent, engine, budget, seed = task
+    rng = random.Random(seed)
+    totals = Counter()
+    for game in range(first, first + count):
+        ai_side = ttt.X if game % 2 == 0 else ttt.O
+        board = ttt.initial_state()
+        while not ttt.terminal(board):
+            turn = ttt.player(board)
+            if opponent == "random" and turn != ai_side:
+                action = rng.choice(sorted(ttt.actions(board)))
+            else:
+                action, nodes = choose(board, engine, budget)
+                totals["searches"] += 1
+                totals["nodes"] += nodes
+            board = ttt.result(board, action)
+            totals["moves"] += 1
+
+        win = ttt.winner(board)
+        totals["games"] += 1
+        totals["x_wins" if win == ttt.X else
+               "o_wins" if win == ttt.O else "draws"] += 1
+        if opponent == "random":
+            totals["ai_draws" if win is None else
+                   "ai_wins" if win == ai_side else "ai_losses"] += 1
+    return totals
+
+
+def play(games, opponent, engine, budget, processes, seed):
+    """
+    Plays games across a process pool and returns a summary dict.
+    """
+    processes = processes or multiprocessing.cpu_count()
+    batch = max(1, -(-games // (processes * 4)))
+    tasks = [(first, min(batch, games - first), opponent, engine, budget,
+              seed + first) for first in range(0, games, batch)]
+
+    start = time.perf_counter()
+    totals = Counter()
+    with multiprocessing.Pool(processes) as pool:
+        for counts in pool.imap_unordered(play_games, tasks):
+            totals.update(counts)
+    elapsed = time.perf_counter() - start
+
+    summary = dict(totals)
+    summary.update({
+        "opponent": opponent,
+        "engine": engine,
+        "processes": processes,
+        "seconds": round(elapsed, 3),
+        "games_per_second": round(totals["games"] / elapsed, 1),
+        "nodes_per_second": round(totals["nodes"] / elapsed),
+    })
+    return summary
+
+
+def parse_position(text):
+    """
+    Returns the board written as 9 cells of X, O or ., or raises
+    ValueError if it is malformed or unreachable by turn order.
+    """
+    cells = text.replace("/", "").strip().upper()
+    if len(cells) != 9 or any(cell not in "XO." for cell in cells):
+        raise ValueError("expected 9 cells of X, O or .")
+    if cells.count("X") - cells.count("O") not in (0, 1):
+        raise ValueError("X moves first and players alternate")
+    return [[None if cell == "." else cell for cell in cells[i:i + 3]]
+            for i in range(0, 9, 3)]
+
+
+def analyze_position(line):
+    """
+    Worker task: returns a JSON-serialisable analysis of one position,
+    or None for blank lines.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        board = parse_position(line)
+    except ValueError as error:
+        return {"position": line, "error": str(error)}
+    value, action, nodes = ttt.alphabeta_search(board)
+    return {
+        "position": line,
+        "player": None if ttt.terminal(board) else ttt.player(board),
+        "value": value,
+        "action": action,
+        "nodes": nodes,
+    }
+
+
+def analyze(lines, out, processes):
+    """
+    Analyzes positions across a process pool, writing results to out in
+    input order. Returns a summary dict.
+    """
+    start = time.perf_counter()
+    totals = Counter()
+    with multiprocessing.Pool(processes) as pool:
+        for analysis in pool.imap(analyze_position, lines, chunksize=64):
+            if analysis is None:
+                continue
+            out.write(json.dumps(analysis) + "\n")
+            if "error" in analysis:
+                totals["errors"] += 1
+                continue
+            totals["positions"] += 1
+            totals["nodes"] += analysis["nodes"]
+            totals[{1: "x_wins", -1: "o_wins", 0: "draws"}[
+                analysis["value"]]] += 1
+    elapsed = time.perf_counter() - start
+
+    summary = dict(totals)
+    summary.update({
+        "seconds": round(elapsed, 3),
+        "positions_per_second": round(totals["positions"] / elapsed, 1),
+        "nodes_per_second": round(totals["nodes"] / elapsed),
+    })
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Headless tictactoe self-play and analysis."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    games = commands.add_parser("play", help="play AI games in bulk")
+    games.add_argument("--games", type=int, default=1000)
+    games.add_argument("--opponent", choices=("ai", "random"), default="ai")
+    games.add_argument("--engine", choices=ENGINES, default="alphabeta")
+    games.add_argument("--budget", type=float, default=0.1,
+                       help="seconds per move for the mnk engine")
+    games.add_argument("--processes", type=int, default=None)
+    games.add_argument("--seed", type=int, default=0)
+
+    positions = commands.add_parser("analyze", help="solve a position file")
+    positions.add_argument("file", nargs="?", default="-",
+                           help="position file, or - for stdin")
+    positions.add_argument("--processes", type=int, default=None)
+
+    args = parser.parse_args()
+    if args.command == "play":
+        print(json.dumps(play(args.games, args.opponent, args.engine,
+                              args.budget, args.processes, args.seed)))
+    elif args.file == "-":
+        summary = analyze(sys.stdin, sys.stdout, args.processes)
+        print(json.dumps(summary), file=sys.stderr)
+    else:
+        with open(args.file, encoding="utf-8") as f:
+            summary = analyze(f, sys.stdout, args.processes)
+        print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,35 @@
 Tic Tac Toe Player
 """
 
+import functools
 import math
+import os
+import struct
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Cell indices of every row, column and diagonal in a board key
+LINES = ((0, 1, 2), (3, 4, 5), (6, 7, 8),
+         (0, 3, 6), (1, 4, 7), (2, 5, 8),
+         (0, 4, 8), (2, 4, 6))
+
+# Cells in the order alpha-beta tries them: center, corners, then edges
+MOVE_ORDER = ((1, 1), (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1))
+
+# Perfect-play table file, written by running this module
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "tictactoe.table")
+TABLE_MAGIC = b"TTT\x01"
+
+# Table entry: canonical board code, then value + 1 << 4 | best cell
+TABLE_ENTRY = struct.Struct("<HB")
+
+# Perfect-play table, loaded on first use by perfect_play
+table = None
+
 
 def initial_state():
     """
@@ -42,7 +65,7 @@ def result(board, move):
     """
 
     # Make a deep copy of the board
-    new_board = [row[:] for row in board]
+    new_board = copy_board(board)
     i, j = move
 
     if not (0 <= i < len(board)) or not (0 <= j < len(board[0])):
@@ -53,6 +76,12 @@ def result(board, move):
     new_board[i][j] = player(board)
     return new_board
 
+def copy_board(board):
+    """
+    Returns a copy of the board that can be changed independently.
+    """
+    return [row[:] for row in board]
+
 def winner(board):
     """
     Returns the winner of the game, if there is one.
@@ -108,46 +137,282 @@ def minimax(board):
 
     if terminal(board):
         return None
-    else:
-        if player(board) == X:
-            opt_action = None
-            val = float("-inf")
-            for action in actions(board):
-                min_val = min_value(result(board, action))
-                if min_val > val:
-                    val = min_val
-                    opt_action = action
+    return perfect_play(board_key(board))[1]
+
+
+def alphabeta(board):
+    """
+    Returns the optimal action for the current player on the board,
+    found with alpha-beta pruning instead of the perfect-play table.
+    """
+    return alphabeta_search(board)[1]
+
+
+def alphabeta_search(board):
+    """
+    Returns (value, action, nodes) for the board: its minimax value, an
+    optimal action (None on terminal boards) and how many positions the
+    alpha-beta search visited, counting the board itself.
+
+    The search makes and unmakes moves on one private copy of the board
+    rather than copying it at every node.
+    """
+    stats = {"nodes": 1}
+    if terminal(board):
+        return utility(board), None, stats["nodes"]
+
+    board = copy_board(board)
+    turn = player(board)
+    val = -math.inf if turn == X else math.inf
+    opt_action = None
+    for action in ordered_actions(board):
+        make(board, action, turn)
+        if turn == X:
+            child = ab_min_value(board, val, math.inf, stats)
         else:
-            opt_action = None
-            val = float("inf")
+            child = ab_max_value(board, -math.inf, val, stats)
+        unmake(board, action)
+        if child > val if turn == X else child < val:
+            val, opt_action = child, action
+        # Nothing beats a forced win
+        if val == (1 if turn == X else -1):
+            break
+    return val, opt_action, stats["nodes"]
+
+
+def ordered_actions(board):
+    """
+    Returns the available actions, most promising first, so that
+    alpha-beta finds good moves early and prunes more.
+    """
+    return [action for action in MOVE_ORDER
+            if board[action[0]][action[1]] is EMPTY]
 
-            for action in actions(board):
-                max_val = max_value(result(board, action))
-                if max_val < val:
-                    val = max_val
-                    opt_action = action
-        return opt_action
 
+def make(board, action, turn):
+    """
+    Plays action for turn on the board in place.
+    """
+    board[action[0]][action[1]] = turn
 
-# The max_value additional function
-def max_value(board):
+
+def unmake(board, action):
+    """
+    Takes action back on the board in place.
+    """
+    board[action[0]][action[1]] = EMPTY
+
+
+# The search functions below play X and O in turn on a shared board,
+# so the side to move follows from which of them is running
+def ab_max_value(board, alpha, beta, stats):
+    stats["nodes"] += 1
     if terminal(board):
         return utility(board)
 
-    val = float('-inf')
-
-    for action in actions(board):
-        val = max(val, min_value(result(board, action)))
+    val = -math.inf
+    for action in MOVE_ORDER:
+        if board[action[0]][action[1]] is not EMPTY:
+            continue
+        make(board, action, X)
+        val = max(val, ab_min_value(board, alpha, beta, stats))
+        unmake(board, action)
+        alpha = max(alpha, val)
+        if alpha >= beta:
+            break
     return val
 
-# The mninvalue additional function
-def min_value(board):
+
+def ab_min_value(board, alpha, beta, stats):
+    stats["nodes"] += 1
     if terminal(board):
         return utility(board)
 
-    val = float('inf')
+    val = math.inf
+    for action in MOVE_ORDER:
+        if board[action[0]][action[1]] is not EMPTY:
+            continue
+        make(board, action, O)
+        val = min(val, ab_max_value(board, alpha, beta, stats))
+        unmake(board, action)
+        beta = min(beta, val)
+        if alpha >= beta:
+            break
+    return val
+
 
-    for action in actions(board):
-        val = min(val, max_value(result(board, action)))
+def board_key(board):
+    """
+    Returns a hashable encoding of the board: its 9 cells row by row.
+    """
+    return tuple(cell for row in board for cell in row)
 
-    return val
+
+def cache_info():
+    """
+    Returns hit, miss and size statistics of the minimax cache.
+    """
+    return solve.cache_info()
+
+
+def clear_cache():
+    """
+    Empties the minimax cache.
+    """
+    solve.cache_clear()
+
+
+@functools.lru_cache(maxsize=None)
+def solve(key):
+    """
+    Returns (value, action) for the board encoded by key under perfect
+    play, where value is the utility the game ends with and action is
+    None on terminal boards. Each position is only searched once, since
+    transpositions reached by different move orders share a cache entry.
+    """
+    for a, b, c in LINES:
+        if key[a] is not None and key[a] == key[b] == key[c]:
+            return (1 if key[a] == X else -1), None
+
+    moves = [i for i, cell in enumerate(key) if cell is EMPTY]
+    if not moves:
+        return 0, None
+
+    turn = X if key.count(X) <= key.count(O) else O
+    best = None
+    for i in moves:
+        value, _ = solve(key[:i] + (turn,) + key[i + 1:])
+        if best is None or (value > best[0] if turn == X else value < best[0]):
+            best = (value, divmod(i, 3))
+    return best
+
+
+def symmetries():
+    """
+    Returns the 8 rotations and reflections of the board as permutations
+    p of cell indices: cell k of the transformed key is cell p[k] of the
+    original.
+    """
+    rotate = tuple(3 * (2 - j) + i for i in range(3) for j in range(3))
+    mirror = tuple(3 * i + (2 - j) for i in range(3) for j in range(3))
+    found = []
+    permutation = tuple(range(9))
+    for _ in range(4):
+        for candidate in (permutation,
+                          tuple(permutation[k] for k in mirror)):
+            found.append(candidate)
+        permutation = tuple(permutation[k] for k in rotate)
+    return tuple(found)
+
+
+SYMMETRIES = symmetries()
+
+
+def encode(key):
+    """
+    Returns the board key as a base-3 number, empty 0, X 1 and O 2.
+    """
+    code = 0
+    for cell in key:
+        code = 3 * code + (0 if cell is EMPTY else 1 if cell == X else 2)
+    return code
+
+
+def canonical(key):
+    """
+    Returns (code, permutation) for the symmetric image of the board key
+    with the smallest encoding, and the permutation that produces it.
+    """
+    return min((encode(tuple(key[k] for k in permutation)), permutation)
+               for permutation in SYMMETRIES)
+
+
+def build_table():
+    """
+    Solves every reachable position once and returns the perfect-play
+    table: {canonical code: (value, best cell)} for each non-terminal
+    position up to symmetry.
+    """
+    built = {}
+    stack = [board_key(initial_state())]
+    seen = set()
+    while stack:
+        key = stack.pop()
+        code, permutation = canonical(key)
+        if code in seen:
+            continue
+        seen.add(code)
+        value, action = solve(key)
+        if action is None:
+            continue
+        # Store the move as seen from the canonical orientation
+        built[code] = (value, permutation.index(3 * action[0] + action[1]))
+        turn = X if key.count(X) <= key.count(O) else O
+        for i, cell in enumerate(key):
+            if cell is EMPTY:
+                stack.append(key[:i] + (turn,) + key[i + 1:])
+    return built
+
+
+def save_table(built, path=TABLE_FILE):
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(TABLE_MAGIC)
+            for code in sorted(built):
+                value, cell = built[code]
+                f.write(TABLE_ENTRY.pack(code, (value + 1) << 4 | cell))
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def load_table(path=TABLE_FILE):
+    with open(path, "rb") as f:
+        data = f.read()
+    if (not data.startswith(TABLE_MAGIC)
+            or (len(data) - len(TABLE_MAGIC)) % TABLE_ENTRY.size):
+        raise ValueError(f"{path} is not a tictactoe table")
+    entries = TABLE_ENTRY.iter_unpack(data[len(TABLE_MAGIC):])
+    return {code: ((packed >> 4) - 1, packed & 0xF)
+            for code, packed in entries}
+
+
+def perfect_play(key):
+    """
+    Returns (value, action) for the non-terminal board encoded by key by
+    looking it up in the perfect-play table. The table is read from
+    TABLE_FILE on first use, or built and saved if it is missing.
+    Boards the table lacks, such as ones that cannot arise from the
+    empty board by alternating moves, are solved on the spot.
+    """
+    global table
+    if table is None:
+        try:
+            table = load_table()
+        except (OSError, ValueError):
+            table = build_table()
+            try:
+                save_table(table)
+            except OSError:
+                pass
+    code, permutation = canonical(key)
+    if code not in table:
+        return solve(key)
+    value, cell = table[code]
+    return value, divmod(permutation[cell], 3)
+
+
+# The max_value additional function
+def max_value(board):
+    return solve(board_key(board))[0]
+
+# The mninvalue additional function
+def min_value(board):
+    return solve(board_key(board))[0]
+
+
+if __name__ == "__main__":
+    save_table(build_table())
+    print(f"Wrote {TABLE_FILE}")
@@ -0,0 +1,196 @@
+"""
+Random knights-and-knaves puzzles and benchmarks for the entailment code.
+
+Usage: python benchmark.py generate N [--seed S]
+       python benchmark.py solve FILE
+       python benchmark.py scaling [--sizes N ...] [--seed S]
+
+generate writes an N-character puzzle, one sentence per line, in the
+notation formula() produces. solve loads such a file and prints what it
+entails about each character. scaling times every entailment backend on
+puzzles of growing size.
+"""
+
+import argparse
+import random
+import string
+import time
+
+import truthtable
+from logic import (And, Biconditional, Implication, KnowledgeBase, Not, Or,
+                   Symbol, load, model_check, model_check_compiled,
+                   model_check_enumerate, model_check_many)
+
+# Backends timed by scaling, with the most symbols each is given: the
+# enumerating ones take time exponential in the number of symbols
+BACKENDS = (
+    ("sat", None),
+    ("many", None),
+    ("incremental", None),
+    ("enumerate", 12),
+    ("compiled", 16),
+    ("vectorized", 24),
+)
+
+
+def name(i):
+    """Returns the name of character i: A to Z, then AA, AB and so on."""
+    letters = ""
+    i += 1
+    while i:
+        i, letter = divmod(i - 1, 26)
+        letters = string.ascii_uppercase[letter] + letters
+    return letters
+
+
+def characters(n):
+    """Returns (knight, knave) symbol pairs for n characters."""
+    return [(Symbol(f"{name(i)} is a Knight"), Symbol(f"{name(i)} is a Knave"))
+            for i in range(n)]
+
+
+def random_puzzle(n, seed=0):
+    """
+    Returns the sentences of a random n-character puzzle in the style of
+    puzzle.py: everyone is a knight or a knave, and each character says
+    one thing about the others, true exactly when they are a knight.
+    Statements are drawn to agree with a hidden assignment, so the
+    puzzle always has a solution, though not always a unique one.
+    """
+    rng = random.Random(seed)
+    people = characters(n)
+    knights = [rng.random() < 0.5 for _ in range(n)]
+
+    def claim(i):
+        """Returns a random claim by character i and whether it is true."""
+        others = [j for j in range(n) if j != i] or [i]
+        j = rng.choice(others)
+        k = rng.choice(others)
+        kind = rng.randrange(5)
+        if kind == 0:
+            # "j is a knight" or "j is a knave"
+            said = rng.random() < 0.5
+            return people[j][0 if said else 1], knights[j] == said
+        if kind == 1:
+            # "j and k are the same kind"
+            return (Or(And(people[j][0], people[k][0]),
+                       And(people[j][1], people[k][1])),
+                    knights[j] == knights[k])
+        if kind == 2:
+            # "j and k are of different kinds"
+            return (Or(And(people[j][0], people[k][1]),
+                       And(people[j][1], people[k][0])),
+                    knights[j] != knights[k])
+        if kind == 3:
+            # "at least one of j and k is a knave"
+            return (Or(people[j][1], people[k][1]),
+                    not (knights[j] and knights[k]))
+        # "if j is a knight, then so is k"
+        return (Implication(people[j][0], people[k][0]),
+                not knights[j] or knights[k])
+
+    sentences = []
+    for i, (knight, knave) in enumerate(people):
+        sentences.append(And(Or(knight, knave), Not(And(knight, knave))))
+        said, true = claim(i)
+        if true != knights[i]:
+            said = Not(said)
+        sentences.append(Biconditional(knight, said))
+    return sentences
+
+
+def solve(path):
+    """
+    Loads the knowledge base at path and prints what it entails about
+    every character in it.
+    """
+    start = time.perf_counter()
+    knowledge = load(path)
+    parsed = time.perf_counter() - start
+
+    queries = [Symbol(symbol) for symbol in sorted(knowledge.symbols())]
+    start = time.perf_counter()
+    entailed = model_check_many(knowledge, queries)
+    solved = time.perf_counter() - start
+    for query, holds in zip(queries, entailed):
+        if holds:
+            print(f"    {query}")
+    print(f"{len(knowledge.conjuncts)} sentences parsed in {parsed:.3f}s, "
+          f"{len(queries)} symbols checked in {solved:.3f}s")
+
+
+def check(backend, knowledge, queries):
+    """Returns, for each query, whether knowledge entails it by backend."""
+    if backend == "many":
+        return model_check_many(knowledge, queries)
+    if backend == "incremental":
+        kb = KnowledgeBase(*knowledge.conjuncts)
+        return [kb.ask(query) for query in queries]
+    check_one = {
+        "sat": model_check,
+        "enumerate": model_check_enumerate,
+        "compiled": model_check_compiled,
+        "vectorized": truthtable.model_check_vectorized,
+    }[backend]
+    return [check_one(knowledge, query) for query in queries]
+
+
+def bench_scaling(sizes, seed):
+    """
+    Generates a puzzle of each size and times every backend on asking
+    whether each character is a knight or a knave, after checking that
+    the backends agree. Backends are skipped beyond their symbol limit.
+    """
+    print(f"{'N':>4} {'entailed':>9} "
+          + " ".join(f"{backend:>11}" for backend, _ in BACKENDS))
+    for n in sizes:
+        knowledge = And(*random_puzzle(n, seed))
+        queries = [symbol for pair in characters(n) for symbol in pair]
+        symbols = 2 * n
+        expected = None
+        cells = []
+        for backend, limit in BACKENDS:
+            if limit is not None and symbols > limit:
+                cells.append(f"{'-':>11}")
+                continue
+            start = time.perf_counter()
+            entailed = check(backend, knowledge, queries)
+            elapsed = time.perf_counter() - start
+            if expected is None:
+                expected = entailed
+            assert entailed == expected, f"{backend} disagrees at N={n}"
+            cells.append(f"{elapsed:>11.4f}")
+        print(f"{n:>4} {sum(expected):>9} " + " ".join(cells))
+    print("seconds to answer all 2N queries; - past the backend's limit")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="write a random puzzle")
+    generate.add_argument("n", type=int, help="number of characters")
+    generate.add_argument("--seed", type=int, default=0)
+
+    puzzle = commands.add_parser("solve", help="solve a puzzle file")
+    puzzle.add_argument("file")
+
+    scaling = commands.add_parser("scaling", help="time backends against N")
+    scaling.add_argument("--sizes", type=int, nargs="+",
+                         default=[2, 4, 6, 8, 12, 25, 50, 100, 200])
+    scaling.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        for sentence in random_puzzle(args.n, args.seed):
+            print(sentence.formula())
+    elif args.command == "solve":
+        solve(args.file)
+    elif args.command == "scaling":
+        bench_scaling(args.sizes, args.seed)
+
+
+if __name__ == "__main__":
+    main()
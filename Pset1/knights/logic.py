@@ -1,7 +1,64 @@
 import itertools
+import multiprocessing
+import re
+import weakref
+
+from solver import Solver
 
 
 class Sentence():
+    """
+    Sentences are hash-consed: building a sentence identical to one that
+    is still alive returns that same object, so shared subexpressions are
+    stored once. Hashes and symbol sets are computed on first use and
+    cached on the sentence.
+
+    And is the exception, because add() can grow it: a new And is always
+    a distinct object. Once an And is made part of another sentence it
+    is frozen for good and replaced by its shared, interned copy.
+    """
+
+    __slots__ = ("_hash", "_symbols", "__weakref__")
+
+    # Live immutable sentences by (class, parts), so each is built once
+    interned = weakref.WeakValueDictionary()
+
+    @classmethod
+    def intern(cls, key):
+        """
+        Returns (sentence, new): the live sentence of class cls built from
+        key, or a new blank one, registered under key unless key is None.
+        """
+        if key is not None:
+            sentence = Sentence.interned.get(key)
+            if sentence is not None:
+                return sentence, False
+        sentence = object.__new__(cls)
+        sentence._hash = None
+        sentence._symbols = None
+        if key is not None:
+            Sentence.interned[key] = sentence
+        return sentence, True
+
+    @classmethod
+    def part(cls, sentence):
+        """
+        Validates a sentence about to become part of another one, and
+        returns the shared copy to store in its place.
+        """
+        Sentence.validate(sentence)
+        if isinstance(sentence, And):
+            return sentence.freeze()
+        return sentence
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = self.rehash()
+        return self._hash
+
+    def rehash(self):
+        """Computes the hash from the parts of the sentence."""
+        raise NotImplementedError
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -11,9 +68,21 @@ class Sentence():
         """Returns string formula representing logical sentence."""
         return ""
 
+    def parts(self):
+        """Returns the sentences this sentence is made of."""
+        return ()
+
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        """Returns the symbols as a frozenset cached on the sentence."""
+        if self._symbols is None:
+            self._symbols = frozenset().union(
+                *[part.symbol_set() for part in self.parts()]
+            )
+        return self._symbols
 
     @classmethod
     def validate(cls, sentence):
@@ -44,15 +113,26 @@ class Sentence():
 
 class Symbol(Sentence):
 
-    def __init__(self, name):
-        self.name = name
+    __slots__ = ("name",)
+
+    def __new__(cls, name):
+        self, new = cls.intern((cls, name))
+        if new:
+            self.name = name
+        return self
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (isinstance(other, Symbol)
+                                 and self.name == other.name)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def rehash(self):
         return hash(("symbol", self.name))
 
+    def __reduce__(self):
+        return self.__class__, (self.name,)
+
     def __repr__(self):
         return self.name
 
@@ -65,21 +145,35 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def symbol_set(self):
+        if self._symbols is None:
+            self._symbols = frozenset((self.name,))
+        return self._symbols
 
 
 class Not(Sentence):
-    def __init__(self, operand):
-        Sentence.validate(operand)
-        self.operand = operand
+
+    __slots__ = ("operand",)
+
+    def __new__(cls, operand):
+        operand = Sentence.part(operand)
+        self, new = cls.intern((cls, operand))
+        if new:
+            self.operand = operand
+        return self
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (isinstance(other, Not)
+                                 and self.operand == other.operand)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def rehash(self):
         return hash(("not", hash(self.operand)))
 
+    def __reduce__(self):
+        return self.__class__, (self.operand,)
+
     def __repr__(self):
         return f"Not({self.operand})"
 
@@ -89,23 +183,38 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def parts(self):
+        return (self.operand,)
 
 
 class And(Sentence):
-    def __init__(self, *conjuncts):
-        for conjunct in conjuncts:
-            Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
+    """
+    Conjunction. Unlike every other sentence it can grow with add(), so
+    each new And is a distinct object, and add() resets its cached hash
+    and symbols. Making an And part of another sentence freezes it:
+    add() then raises TypeError, and the parent holds the interned copy.
+    """
+
+    __slots__ = ("conjuncts", "_canonical")
+
+    def __new__(cls, *conjuncts):
+        self, _ = cls.intern(None)
+        self.conjuncts = [Sentence.part(conjunct) for conjunct in conjuncts]
+        self._canonical = None
+        return self
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (isinstance(other, And)
+                                 and self.conjuncts == other.conjuncts)
 
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+    __hash__ = Sentence.__hash__
+
+    def rehash(self):
+        return hash(("and", tuple(hash(conjunct)
+                                  for conjunct in self.conjuncts)))
+
+    def __reduce__(self):
+        return self.__class__, tuple(self.conjuncts)
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -114,8 +223,25 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
-        Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        if self._canonical is not None:
+            raise TypeError("cannot add to an And that is part of "
+                            "another sentence")
+        self.conjuncts.append(Sentence.part(conjunct))
+        self._hash = None
+        self._symbols = None
+
+    def freeze(self):
+        """
+        Stops the And from growing and returns its interned copy, which
+        is the And itself unless an equal one was frozen first.
+        """
+        if self._canonical is None:
+            key = (And, tuple(self.conjuncts))
+            canonical = Sentence.interned.get(key)
+            if canonical is None:
+                canonical = Sentence.interned[key] = self
+            self._canonical = canonical
+        return self._canonical
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,23 +252,33 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def parts(self):
+        return self.conjuncts
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
-        for disjunct in disjuncts:
-            Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+
+    __slots__ = ("disjuncts",)
+
+    def __new__(cls, *disjuncts):
+        disjuncts = tuple(Sentence.part(disjunct) for disjunct in disjuncts)
+        self, new = cls.intern((cls, disjuncts))
+        if new:
+            self.disjuncts = list(disjuncts)
+        return self
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (isinstance(other, Or)
+                                 and self.disjuncts == other.disjuncts)
 
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+    __hash__ = Sentence.__hash__
+
+    def rehash(self):
+        return hash(("or", tuple(hash(disjunct)
+                                 for disjunct in self.disjuncts)))
+
+    def __reduce__(self):
+        return self.__class__, tuple(self.disjuncts)
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -157,25 +293,36 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def parts(self):
+        return self.disjuncts
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
-        Sentence.validate(antecedent)
-        Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+
+    __slots__ = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
+        antecedent = Sentence.part(antecedent)
+        consequent = Sentence.part(consequent)
+        self, new = cls.intern((cls, antecedent, consequent))
+        if new:
+            self.antecedent = antecedent
+            self.consequent = consequent
+        return self
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (isinstance(other, Implication)
+                                 and self.antecedent == other.antecedent
+                                 and self.consequent == other.consequent)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def rehash(self):
         return hash(("implies", hash(self.antecedent), hash(self.consequent)))
 
+    def __reduce__(self):
+        return self.__class__, (self.antecedent, self.consequent)
+
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
 
@@ -188,45 +335,514 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def parts(self):
+        return (self.antecedent, self.consequent)
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
-        Sentence.validate(left)
-        Sentence.validate(right)
-        self.left = left
-        self.right = right
+
+    __slots__ = ("left", "right")
+
+    def __new__(cls, left, right):
+        left = Sentence.part(left)
+        right = Sentence.part(right)
+        self, new = cls.intern((cls, left, right))
+        if new:
+            self.left = left
+            self.right = right
+        return self
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (isinstance(other, Biconditional)
+                                 and self.left == other.left
+                                 and self.right == other.right)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def rehash(self):
         return hash(("biconditional", hash(self.left), hash(self.right)))
 
+    def __reduce__(self):
+        return self.__class__, (self.left, self.right)
+
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
     def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+        return self.left.evaluate(model) == self.right.evaluate(model)
 
     def formula(self):
-        left = Sentence.parenthesize(str(self.left))
-        right = Sentence.parenthesize(str(self.right))
+        left = Sentence.parenthesize(self.left.formula())
+        right = Sentence.parenthesize(self.right.formula())
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+    def parts(self):
+        return (self.left, self.right)
+
+
+# Operators of the formula() notation: binding power, then whether a
+# run of them becomes one And or Or rather than nesting
+OPERATORS = {"¬": (5, False), "∧": (4, True), "∨": (3, True),
+             "=>": (2, False), "<=>": (1, False)}
+TOKENS = re.compile(r"(<=>|=>|[¬∧∨()])")
+
+
+def parse(text):
+    """
+    Returns the sentence written in the notation formula() produces:
+    symbol names, which may contain spaces, joined by ¬, ∧, ∨, => and
+    <=> and grouped with parentheses. ¬ binds tightest and <=> loosest,
+    runs of ∧ or ∨ build a single And or Or, and => groups to the right.
+    Raises ValueError on malformed text.
+    """
+    operands = []
+    # Pending operators as [operator, operand count], and open "("
+    pending = []
+
+    def reduce():
+        operator, count = pending.pop()
+        if operator == "¬":
+            operands.append(Not(operands.pop()))
+            return
+        parts = operands[-count:]
+        del operands[-count:]
+        if operator == "∧":
+            operands.append(And(*parts))
+        elif operator == "∨":
+            operands.append(Or(*parts))
+        elif operator == "=>":
+            operands.append(Implication(*parts))
+        else:
+            operands.append(Biconditional(*parts))
+
+    expect_operand = True
+    for token in TOKENS.split(text):
+        token = token.strip()
+        if not token:
+            continue
+        if expect_operand:
+            if token in ("(", "¬"):
+                pending.append([token, 1])
+            elif token in OPERATORS or token == ")":
+                raise ValueError(f"expected a sentence before {token!r}")
+            else:
+                operands.append(Symbol(token))
+                expect_operand = False
+        elif token == ")":
+            while pending and pending[-1][0] != "(":
+                reduce()
+            if not pending:
+                raise ValueError("unbalanced )")
+            pending.pop()
+        elif token in OPERATORS:
+            power, chains = OPERATORS[token]
+            while pending and pending[-1][0] != "(":
+                top = pending[-1][0]
+                if OPERATORS[top][0] < power or (top == token == "=>"):
+                    break
+                if top == token and chains:
+                    break
+                reduce()
+            if pending and pending[-1][0] == token and chains:
+                pending[-1][1] += 1
+            else:
+                pending.append([token, 2])
+            expect_operand = True
+        else:
+            raise ValueError(f"expected an operator before {token!r}")
+
+    if expect_operand:
+        raise ValueError("expected a sentence at the end")
+    while pending:
+        if pending[-1][0] == "(":
+            raise ValueError("unbalanced (")
+        reduce()
+    return operands[0]
+
+
+def load(path):
+    """
+    Returns the knowledge base in the file at path as an And of one
+    sentence per line, skipping blank lines and lines starting with #.
+    """
+    sentences = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                sentences.append(parse(line))
+            except ValueError as error:
+                raise ValueError(f"{path}:{number}: {error}") from None
+    return And(*sentences)
+
+
+class CNF():
+    """
+    Clauses over integer variables, built from sentences with the Tseitin
+    transform: every compound subsentence gets a fresh variable defined
+    by a few clauses, so the clauses grow linearly with the sentences
+    instead of exponentially. Symbols map to variables by name, and
+    identical subsentences share one variable.
+    """
+
+    def __init__(self):
+        self.variables = {}
+        self.count = 0
+        self.clauses = []
+        self.literals = {}
+
+    def variable(self, name):
+        """Returns the variable standing for the symbol called name."""
+        if name not in self.variables:
+            self.variables[name] = self.fresh()
+        return self.variables[name]
+
+    def fresh(self):
+        self.count += 1
+        return self.count
+
+    def add(self, sentence, guard=None):
+        """
+        Adds clauses requiring sentence to be true, or only while the
+        variable guard is true if one is given.
+        """
+        unless = [-guard] if guard else []
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct, guard)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(disjunct)
+                                 for disjunct in sentence.disjuncts]
+                                + unless)
+        else:
+            self.clauses.append([self.literal(sentence)] + unless)
+
+    def literal(self, sentence):
+        """
+        Returns a literal that is true exactly when sentence is, adding
+        the clauses that define it the first time sentence is seen.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, (And, Or)):
+            parts = (sentence.conjuncts if isinstance(sentence, And)
+                     else sentence.disjuncts)
+            if len(parts) == 1:
+                return self.literal(parts[0])
+            # Or is the dual of And: negate the inputs and the output
+            sign = 1 if isinstance(sentence, And) else -1
+            children = [sign * self.literal(part) for part in parts]
+            v = self.fresh()
+            for child in children:
+                self.clauses.append([-v, child])
+            self.clauses.append([v] + [-child for child in children])
+            literal = sign * v
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            c = self.literal(sentence.consequent)
+            literal = self.fresh()
+            self.clauses.extend([[-literal, -a, c], [literal, a],
+                                 [literal, -c]])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            literal = self.fresh()
+            self.clauses.extend([[-literal, -a, b], [-literal, a, -b],
+                                 [literal, a, b], [literal, -a, -b]])
+        else:
+            raise TypeError(f"cannot convert {sentence!r} to CNF")
+        self.literals[sentence] = literal
+        return literal
+
+
+class KnowledgeBase():
+    """
+    Knowledge base that keeps one SAT solver across changes and queries,
+    so learned clauses and propagated units carry over from each query
+    to the next.
+
+    Every sentence told is guarded by a fresh selector variable, and
+    queries assume the selectors of the sentences in force. Retracting
+    a sentence adds the unit clause "not selector", which switches its
+    clauses off for good, along with every clause learned from them.
+
+    Answers are cached. Telling a sentence can only turn "not entailed"
+    into "entailed", and keeps each such answer whose counterexample
+    still satisfies the new sentence. Retracting can only do the
+    opposite, and drops just the "entailed" answers whose proof assumed
+    the retracted sentence's selector.
+
+    An And that is told or asked is copied and frozen first, so the
+    caller can keep adding to it without changing the knowledge base.
+    """
+
+    def __init__(self, *sentences):
+        self.cnf = CNF()
+        self.solver = Solver()
+        self.fed = 0
+        self.selectors = {}
+        self.frames = [[]]
+        # Entailed queries, with the selectors their refutation used
+        self.entailed = {}
+        self.counterexamples = {}
+        for sentence in sentences:
+            self.tell(sentence)
+
+    def sentences(self):
+        """Returns the sentences in force, oldest first."""
+        return list(self.selectors)
+
+    def knowledge(self):
+        """Returns the sentences in force as one And."""
+        return And(*self.selectors)
+
+    def frozen(self, sentence):
+        """Returns sentence, or a frozen copy of it if it is an And."""
+        Sentence.validate(sentence)
+        if isinstance(sentence, And):
+            return And(*sentence.conjuncts).freeze()
+        return sentence
+
+    def feed(self):
+        """Passes the clauses added to the CNF since the last call on."""
+        self.solver.reserve(self.cnf.count)
+        for clause in self.cnf.clauses[self.fed:]:
+            self.solver.add_clause(clause)
+        self.fed = len(self.cnf.clauses)
+
+    def tell(self, sentence):
+        """Adds sentence to the knowledge base."""
+        sentence = self.frozen(sentence)
+        if sentence in self.selectors:
+            return
+        selector = self.cnf.fresh()
+        self.cnf.add(sentence, selector)
+        self.feed()
+        self.selectors[sentence] = selector
+        self.frames[-1].append(sentence)
+
+        for query, model in list(self.counterexamples.items()):
+            try:
+                holds = sentence.evaluate(model)
+            except Exception:
+                holds = False
+            if not holds:
+                del self.counterexamples[query]
+
+    def retract(self, sentence):
+        """Removes sentence, which must be in force, from the KB."""
+        sentence = self.frozen(sentence)
+        if sentence not in self.selectors:
+            raise ValueError(f"{sentence.formula()} is not in the "
+                             "knowledge base")
+        selector = self.selectors.pop(sentence)
+        self.solver.add_clause([-selector])
+        self.entailed = {query: used
+                         for query, used in self.entailed.items()
+                         if selector not in used}
+
+    def push(self):
+        """Starts a frame of sentences that pop() retracts together."""
+        self.frames.append([])
+
+    def pop(self):
+        """Retracts every sentence told since the matching push()."""
+        if len(self.frames) == 1:
+            raise IndexError("pop without push")
+        for sentence in reversed(self.frames.pop()):
+            if sentence in self.selectors:
+                self.retract(sentence)
+
+    def ask(self, query):
+        """Checks if the knowledge base entails query."""
+        query = self.frozen(query)
+        if query in self.entailed:
+            return True
+        if query in self.counterexamples:
+            return False
+
+        negated = -self.cnf.literal(query)
+        self.feed()
+        if not self.solver.solve(list(self.selectors.values()) + [negated]):
+            self.entailed[query] = frozenset(self.solver.core)
+            return True
+        model = self.solver.model
+        self.counterexamples[query] = {
+            name: model[variable]
+            for name, variable in self.cnf.variables.items()
+        }
+        return False
+
+
+class Compiler():
+    """
+    Turns sentences into Python functions of a sequence of truth values
+    (True and False, or 1 and 0), one per symbol in a fixed order, so
+    that evaluating a sentence is a single call with no method dispatch
+    and no dict lookups.
+
+    Each sentence becomes one short-circuiting Python expression. Parts
+    nested deeper than MAX_DEPTH are split into helper functions, so
+    arbitrarily deep sentences stay within the parser's nesting limit.
+    """
+
+    MAX_DEPTH = 40
+
+    def __init__(self, names):
+        self.index = {name: i for i, name in enumerate(names)}
+        self.helpers = []
+
+    def compile(self, sentence):
+        """Returns a function evaluating sentence over a list of values."""
+        body = self.expression(sentence, 0)
+        source = "".join(self.helpers)
+        source += f"def sentence(m):\n    return {body}\n"
+        namespace = {}
+        exec(source, namespace)
+        return namespace["sentence"]
+
+    def expression(self, sentence, depth):
+        if depth > self.MAX_DEPTH:
+            body = self.expression(sentence, 0)
+            name = f"helper{len(self.helpers)}"
+            self.helpers.append(f"def {name}(m):\n    return {body}\n")
+            return f"{name}(m)"
+        depth += 1
+
+        if isinstance(sentence, Symbol):
+            if sentence.name not in self.index:
+                raise Exception(f"variable {sentence.name} not in model")
+            return f"m[{self.index[sentence.name]}]"
+        if isinstance(sentence, Not):
+            return f"(not {self.expression(sentence.operand, depth)})"
+        if isinstance(sentence, And):
+            parts = [self.expression(conjunct, depth)
+                     for conjunct in sentence.conjuncts]
+            return f"({' and '.join(parts)})" if parts else "True"
+        if isinstance(sentence, Or):
+            parts = [self.expression(disjunct, depth)
+                     for disjunct in sentence.disjuncts]
+            return f"({' or '.join(parts)})" if parts else "False"
+        if isinstance(sentence, Implication):
+            antecedent = self.expression(sentence.antecedent, depth)
+            consequent = self.expression(sentence.consequent, depth)
+            return f"((not {antecedent}) or {consequent})"
+        if isinstance(sentence, Biconditional):
+            left = self.expression(sentence.left, depth)
+            right = self.expression(sentence.right, depth)
+            return f"({left} == {right})"
+        raise TypeError(f"cannot compile {sentence!r}")
+
+
+def compile_sentence(sentence, names):
+    """
+    Returns a function that evaluates sentence given a sequence of truth
+    values for the symbols called names, in that order.
+    """
+    return Compiler(names).compile(sentence)
+
+
+def model_check_compiled(knowledge, query):
+    """
+    Checks if knowledge base entails query, by enumerating every model
+    with both sentences compiled to functions over a tuple of values.
+    """
+    names = sorted(set.union(knowledge.symbols(), query.symbols()))
+    compiler = Compiler(names)
+    knowledge = compiler.compile(knowledge)
+    query = compiler.compile(query)
+    return all(query(model)
+               for model in itertools.product((True, False),
+                                              repeat=len(names))
+               if knowledge(model))
 
 
 def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    """
+    Checks if knowledge base entails query, by asking a SAT solver
+    whether knowledge can hold while query is false.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    negated = -cnf.literal(query)
+    solver = Solver()
+    for clause in cnf.clauses:
+        solver.add_clause(clause)
+    return not solver.solve([negated])
+
+
+def model_check_many(knowledge, queries):
+    """
+    Returns, for each query in order, whether knowledge base entails it.
+
+    The knowledge base is converted and solved once. Every model found
+    rules out all the queries it makes false, so only queries still true
+    in every model seen so far cost a solver call each, and those calls
+    reuse the clauses the solver has already learned.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    literals = [cnf.literal(query) for query in queries]
+    solver = Solver()
+    solver.reserve(cnf.count)
+    for clause in cnf.clauses:
+        solver.add_clause(clause)
+
+    # A contradictory knowledge base entails everything
+    entailed = [True] * len(literals)
+    if not solver.solve():
+        return entailed
+    model = solver.model
+    candidates = []
+    for i, literal in enumerate(literals):
+        if model[abs(literal)] == (literal > 0):
+            candidates.append(i)
+        else:
+            entailed[i] = False
+
+    while candidates:
+        i = candidates.pop()
+        if not solver.solve([-literals[i]]):
+            continue
+        entailed[i] = False
+        model = solver.model
+        remaining = []
+        for j in candidates:
+            if model[abs(literals[j])] == (literals[j] > 0):
+                remaining.append(j)
+            else:
+                entailed[j] = False
+        candidates = remaining
+    return entailed
+
+
+def check_puzzle(task):
+    """Worker task: returns model_check_many for (knowledge, queries)."""
+    return model_check_many(*task)
+
+
+def model_check_puzzles(knowledges, queries, processes=None):
+    """
+    Returns model_check_many(knowledge, queries) for each independent
+    knowledge base, checked across a pool of processes, or in this
+    process if processes is 1.
+    """
+    tasks = [(knowledge, queries) for knowledge in knowledges]
+    if processes == 1:
+        return [check_puzzle(task) for task in tasks]
+    with multiprocessing.Pool(processes) as pool:
+        return pool.map(check_puzzle, tasks)
+
+
+def model_check_enumerate(knowledge, query):
+    """Checks if knowledge base entails query, by enumerating every model."""
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -97,7 +97,7 @@ knowledge3 = And(
 )
 
 
-def main():
+def main(processes=1):
     symbols = [AKnight, AKnave, BKnight, BKnave, CKnight, CKnave]
     puzzles = [
         ("Puzzle 0", knowledge0),
@@ -105,13 +105,15 @@ def main():
         ("Puzzle 2", knowledge2),
         ("Puzzle 3", knowledge3)
     ]
-    for puzzle, knowledge in puzzles:
+    results = model_check_puzzles([knowledge for _, knowledge in puzzles],
+                                  symbols, processes)
+    for (puzzle, knowledge), entailed in zip(puzzles, results):
         print(puzzle)
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
-            for symbol in symbols:
-                if model_check(knowledge, symbol):
+            for symbol, holds in zip(symbols, entailed):
+                if holds:
                     print(f"    {symbol}")
 
 
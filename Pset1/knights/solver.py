@@ -0,0 +1,329 @@
+"""
+Conflict-driven clause learning SAT solver.
+
+Variables are positive ints and literals are nonzero ints, -v being the
+negation of v. Clauses watch two of their literals, so unit propagation
+only visits clauses whose watched literal just became false. Conflicts
+are analysed to their first unique implication point, and the learned
+clause sends the search straight back to the level where it becomes
+unit. Branching follows variable activity, with saved phases and
+geometric restarts.
+
+A Solver is incremental: clauses can be added between calls to solve(),
+and learned clauses stay valid and are kept. solve() also takes
+assumptions, literals that are forced true for that call only, and when
+they make the clauses unsatisfiable it records which of them were used.
+"""
+
+import heapq
+
+# Activity decay and restart growth, as in MiniSat
+DECAY = 0.95
+RESTART_FIRST = 100
+RESTART_GROWTH = 1.5
+RESCALE = 1e100
+
+
+class Solver():
+
+    def __init__(self):
+        self.clauses = []
+        self.watches = {}
+        # Per variable, indexed from 1: value 1, -1 or 0 if unassigned,
+        # decision level, reason clause index and branching activity
+        self.values = [0]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phases = [False]
+        self.heap = []
+        self.increment = 1.0
+        self.trail = []
+        self.limits = []
+        self.head = 0
+        self.ok = True
+        self.model = None
+        self.core = None
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+
+    @property
+    def variables(self):
+        return len(self.values) - 1
+
+    def reserve(self, variable):
+        """Makes room for every variable up to variable."""
+        while len(self.values) <= variable:
+            new = len(self.values)
+            self.values.append(0)
+            self.levels.append(0)
+            self.reasons.append(None)
+            self.activity.append(0.0)
+            self.phases.append(False)
+            self.watches[new] = []
+            self.watches[-new] = []
+            heapq.heappush(self.heap, (0.0, new))
+
+    def new_variable(self):
+        self.reserve(len(self.values))
+        return len(self.values) - 1
+
+    def value(self, literal):
+        value = self.values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def add_clause(self, literals):
+        """
+        Adds a clause. Returns False if the clauses are now known to be
+        unsatisfiable, True otherwise.
+        """
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        literals = set(literals)
+        self.reserve(max(abs(literal) for literal in literals)
+                     if literals else 0)
+        clause = []
+        for literal in literals:
+            if -literal in literals:
+                return True
+            value = self.value(literal)
+            if value > 0:
+                return True
+            if value == 0:
+                clause.append(literal)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.attach(clause)
+        return self.ok
+
+    def attach(self, clause):
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches[clause[0]].append(index)
+        self.watches[clause[1]].append(index)
+        return index
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = len(self.limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses. Returns the index
+        of a falsified clause, or None if there is no conflict.
+        """
+        clauses, values, watches = self.clauses, self.values, self.watches
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            self.propagations += 1
+            watching = watches[false]
+            kept = []
+            for position, index in enumerate(watching):
+                clause = clauses[index]
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                other = clause[0]
+                other_value = values[abs(other)]
+                if (other_value if other > 0 else -other_value) > 0:
+                    kept.append(index)
+                    continue
+
+                # Look for a literal that is not false to watch instead
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    value = values[abs(literal)]
+                    if (value if literal > 0 else -value) >= 0:
+                        clause[1], clause[k] = literal, false
+                        watches[literal].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if other_value == 0:
+                        self.assign(other, index)
+                    else:
+                        kept.extend(watching[position + 1:])
+                        watches[false] = kept
+                        return index
+            watches[false] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the clause learned from a conflict, asserting literal
+        first, and the level to backjump to.
+        """
+        level = len(self.limits)
+        learned = [None]
+        seen = set()
+        pending = 0
+        index = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for literal in clause:
+                variable = abs(literal)
+                if variable in seen or self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump(variable)
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learned.append(literal)
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+        learned[0] = -literal
+
+        if len(learned) == 1:
+            return learned, 0
+        # Watch the literal from the deepest remaining level second
+        deepest = max(range(1, len(learned)),
+                      key=lambda k: self.levels[abs(learned[k])])
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def analyze_final(self, literal):
+        """
+        Returns the assumptions that together force assumption literal
+        false, including literal itself, by walking the implications on
+        the trail back to the assumption decisions they came from.
+        """
+        core = {literal}
+        if not self.limits:
+            return core
+        seen = {abs(literal)}
+        for index in range(len(self.trail) - 1, self.limits[0] - 1, -1):
+            assigned = self.trail[index]
+            variable = abs(assigned)
+            if variable not in seen:
+                continue
+            reason = self.reasons[variable]
+            if reason is None:
+                core.add(assigned)
+            else:
+                for other in self.clauses[reason]:
+                    if self.levels[abs(other)] > 0:
+                        seen.add(abs(other))
+        return core
+
+    def bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > RESCALE:
+            self.activity = [activity / RESCALE for activity in self.activity]
+            self.increment /= RESCALE
+            self.heap = [(-self.activity[v], v)
+                         for v in range(1, len(self.values))
+                         if self.values[v] == 0]
+            heapq.heapify(self.heap)
+        elif self.values[variable] == 0:
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+
+    def backtrack(self, level):
+        if len(self.limits) <= level:
+            return
+        start = self.limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phases[variable] = literal > 0
+            self.values[variable] = 0
+            self.reasons[variable] = None
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.limits[level:]
+        self.head = start
+
+    def pick(self):
+        """Returns the unassigned variable with the highest activity."""
+        while self.heap:
+            activity, variable = heapq.heappop(self.heap)
+            if (self.values[variable] == 0
+                    and -activity == self.activity[variable]):
+                return variable
+        for variable in range(1, len(self.values)):
+            if self.values[variable] == 0:
+                return variable
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True and sets model if the clauses, together with every
+        assumption literal, are satisfiable, or returns False and sets core
+        to a set of assumptions that are already unsatisfiable with the
+        clauses, empty if the clauses are unsatisfiable on their own.
+        """
+        self.model = None
+        self.core = set()
+        if not self.ok:
+            return False
+        for literal in assumptions:
+            self.reserve(abs(literal))
+        self.backtrack(0)
+        if self.propagate() is not None:
+            self.ok = False
+            return False
+
+        restart = RESTART_FIRST
+        conflicts = 0
+        try:
+            while True:
+                conflict = self.propagate()
+                if conflict is not None:
+                    self.conflicts += 1
+                    conflicts += 1
+                    if not self.limits:
+                        self.ok = False
+                        return False
+                    learned, level = self.analyze(conflict)
+                    self.backtrack(level)
+                    if len(learned) == 1:
+                        self.assign(learned[0], None)
+                    else:
+                        self.assign(learned[0], self.attach(learned))
+                    self.increment /= DECAY
+                    continue
+
+                if conflicts >= restart:
+                    conflicts = 0
+                    restart *= RESTART_GROWTH
+                    self.backtrack(0)
+                    continue
+
+                # Assumptions take the first decision levels, in order
+                literal = None
+                while len(self.limits) < len(assumptions):
+                    assumption = assumptions[len(self.limits)]
+                    value = self.value(assumption)
+                    if value < 0:
+                        self.core = self.analyze_final(assumption)
+                        return False
+                    self.limits.append(len(self.trail))
+                    if value == 0:
+                        literal = assumption
+                        break
+                if literal is None:
+                    variable = self.pick()
+                    if variable is None:
+                        self.model = [value > 0 for value in self.values]
+                        return True
+                    self.decisions += 1
+                    literal = variable if self.phases[variable] else -variable
+                    self.limits.append(len(self.trail))
+                self.assign(literal, None)
+        finally:
+            self.backtrack(0)
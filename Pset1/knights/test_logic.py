@@ -0,0 +1,80 @@
+import pickle
+import unittest
+
+from logic import And, Implication, KnowledgeBase, Not, Or, Symbol
+
+A = Symbol("A")
+B = Symbol("B")
+C = Symbol("C")
+
+
+class TestInterning(unittest.TestCase):
+
+    def test_immutable_sentences_are_shared(self):
+        self.assertIs(Or(A, Not(B)), Or(A, Not(B)))
+        self.assertIs(pickle.loads(pickle.dumps(Implication(A, B))),
+                      Implication(A, B))
+
+    def test_equal_ands_are_independent(self):
+        kb1 = And(Or(A, B))
+        kb2 = And(Or(A, B))
+        self.assertIsNot(kb1, kb2)
+        kb1.add(C)
+        self.assertEqual(kb1.conjuncts, [Or(A, B), C])
+        self.assertEqual(kb2.conjuncts, [Or(A, B)])
+
+    def test_nested_and_is_frozen(self):
+        inner = And(A)
+        outer = Or(inner, B)
+        with self.assertRaises(TypeError):
+            inner.add(C)
+        self.assertEqual(outer.symbols(), {"A", "B"})
+        self.assertEqual(hash(Or(And(A), B)), hash(outer))
+
+    def test_add_resets_cached_symbols(self):
+        kb = And(A)
+        self.assertEqual(kb.symbols(), {"A"})
+        hashed = hash(kb)
+        kb.add(Or(B, C))
+        self.assertEqual(kb.symbols(), {"A", "B", "C"})
+        self.assertNotEqual(hash(kb), hashed)
+        self.assertEqual(hash(kb), hash(And(A, Or(B, C))))
+
+    def test_puzzle_subformulas_are_shared(self):
+        knight = Symbol("A is a Knight")
+        knave = Symbol("A is a Knave")
+        x = And(Or(knight, knave), Not(And(knight, knave)))
+        y = And(Or(knight, knave), Not(And(knight, knave)))
+        self.assertIsNot(x, y)
+        self.assertIs(x.conjuncts[0], y.conjuncts[0])
+        self.assertIs(x.conjuncts[1], y.conjuncts[1])
+        self.assertIs(Not(x), Not(y))
+
+
+
+class TestKnowledgeBase(unittest.TestCase):
+
+    def test_told_and_is_copied(self):
+        s = And(A)
+        kb = KnowledgeBase()
+        kb.tell(s)
+        s.add(B)
+        self.assertEqual(kb.sentences(), [And(A)])
+        self.assertFalse(kb.ask(B))
+        kb.retract(And(A))
+        self.assertEqual(kb.sentences(), [])
+
+    def test_retract_keeps_unrelated_entailments(self):
+        kb = KnowledgeBase(A, Implication(A, B), C)
+        self.assertTrue(kb.ask(B))
+        self.assertTrue(kb.ask(C))
+        kb.retract(C)
+        self.assertIn(B, kb.entailed)
+        self.assertNotIn(C, kb.entailed)
+        self.assertFalse(kb.ask(C))
+        kb.retract(A)
+        self.assertFalse(kb.ask(B))
+
+
+if __name__ == "__main__":
+    unittest.main()
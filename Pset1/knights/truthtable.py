@@ -0,0 +1,154 @@
+"""
+Bit-parallel truth tables for exhaustive model checking.
+
+Assignment a of n symbols gives symbol i the value of bit i of a, so a
+truth table over 2 ** n assignments is a vector of 2 ** n bits, and each
+connective is one bitwise operation over whole vectors. Tables are built
+chunk by chunk, 2 ** chunk_bits assignments at a time, to bound memory.
+
+Vectors are NumPy arrays of uint64 words when NumPy is installed, and
+Python ints used as bit strings otherwise.
+"""
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+CHUNK_BITS = 20
+
+# Bits of a 64-bit word where symbol i is true, for the low 6 symbols
+WORD_PATTERNS = (0xAAAAAAAAAAAAAAAA, 0xCCCCCCCCCCCCCCCC, 0xF0F0F0F0F0F0F0F0,
+                 0xFF00FF00FF00FF00, 0xFFFF0000FFFF0000, 0xFFFFFFFF00000000)
+
+
+class IntVectors():
+    """
+    Truth vectors of 2 ** bits assignments as Python ints.
+    """
+
+    def __init__(self, bits):
+        self.size = 1 << bits
+        self.full = (1 << self.size) - 1
+        self.patterns = []
+        for i in range(bits):
+            # 2 ** i false assignments, then 2 ** i true ones, repeated
+            width = 1 << i
+            pattern = ((1 << width) - 1) << width
+            width *= 2
+            while width < self.size:
+                pattern |= pattern << width
+                width *= 2
+            self.patterns.append(pattern)
+
+    def symbol(self, i, chunk):
+        """Returns the vector of symbol i in the chunk numbered chunk."""
+        if i < len(self.patterns):
+            return self.patterns[i]
+        return self.full if chunk >> (i - len(self.patterns)) & 1 else 0
+
+    def true(self):
+        return self.full
+
+    def false(self):
+        return 0
+
+    def invert(self, vector):
+        return vector ^ self.full
+
+    def any(self, vector):
+        return vector != 0
+
+
+class WordVectors():
+    """
+    Truth vectors of 2 ** bits assignments as NumPy arrays of uint64
+    words, for bits of at least 6.
+    """
+
+    def __init__(self, bits):
+        words = 1 << (bits - 6)
+        self.bits = bits
+        self.full = numpy.uint64(0xFFFFFFFFFFFFFFFF)
+        index = numpy.arange(words, dtype=numpy.uint64)
+        self.patterns = [numpy.full(words, pattern, dtype=numpy.uint64)
+                         for pattern in WORD_PATTERNS]
+        for i in range(6, bits):
+            self.patterns.append(numpy.where(
+                (index >> numpy.uint64(i - 6)) & numpy.uint64(1),
+                self.full, numpy.uint64(0)
+            ))
+        self.ones = numpy.full(words, self.full, dtype=numpy.uint64)
+        self.zeros = numpy.zeros(words, dtype=numpy.uint64)
+
+    def symbol(self, i, chunk):
+        if i < self.bits:
+            return self.patterns[i]
+        return self.ones if chunk >> (i - self.bits) & 1 else self.zeros
+
+    def true(self):
+        return self.ones
+
+    def false(self):
+        return self.zeros
+
+    def invert(self, vector):
+        return ~vector
+
+    def any(self, vector):
+        return bool(vector.any())
+
+
+def table(sentence, index, vectors, chunk):
+    """
+    Returns the truth vector of sentence over one chunk of assignments,
+    where index maps symbol names to bit positions.
+    """
+    if isinstance(sentence, Symbol):
+        return vectors.symbol(index[sentence.name], chunk)
+    if isinstance(sentence, Not):
+        return vectors.invert(table(sentence.operand, index, vectors, chunk))
+    if isinstance(sentence, And):
+        result = vectors.true()
+        for conjunct in sentence.conjuncts:
+            result = result & table(conjunct, index, vectors, chunk)
+        return result
+    if isinstance(sentence, Or):
+        result = vectors.false()
+        for disjunct in sentence.disjuncts:
+            result = result | table(disjunct, index, vectors, chunk)
+        return result
+    if isinstance(sentence, Implication):
+        antecedent = table(sentence.antecedent, index, vectors, chunk)
+        consequent = table(sentence.consequent, index, vectors, chunk)
+        return vectors.invert(antecedent) | consequent
+    if isinstance(sentence, Biconditional):
+        left = table(sentence.left, index, vectors, chunk)
+        right = table(sentence.right, index, vectors, chunk)
+        return vectors.invert(left ^ right)
+    raise TypeError(f"cannot tabulate {sentence!r}")
+
+
+def model_check_vectorized(knowledge, query, chunk_bits=CHUNK_BITS):
+    """
+    Checks if knowledge base entails query, by tabulating both over
+    every assignment, 2 ** chunk_bits at a time, and looking for one
+    where knowledge holds and query does not.
+    """
+    names = sorted(set.union(knowledge.symbols(), query.symbols()))
+    index = {name: i for i, name in enumerate(names)}
+    bits = min(len(names), chunk_bits)
+    if numpy is not None and bits >= 6:
+        vectors = WordVectors(bits)
+    else:
+        vectors = IntVectors(bits)
+
+    for chunk in range(1 << (len(names) - bits)):
+        counterexamples = (table(knowledge, index, vectors, chunk)
+                           & vectors.invert(table(query, index, vectors,
+                                                  chunk)))
+        if vectors.any(counterexamples):
+            return False
+    return True